@@ -0,0 +1,7 @@
+"""
+Нагрузочные тесты REST API.
+
+    python -m benchmarks.api --entities 1000 10000 --depth 3 6 --output results.json
+
+    python -m benchmarks.asgi_vs_wsgi --wsgi ... --asgi ...
+"""
@@ -0,0 +1,178 @@
+"""
+Нагрузочный тест REST API: задержка (p50/p95/p99), пропускная способность и число SQL-запросов на запрос.
+
+Для каждой комбинации размера сети и глубины иерархии создается тестовая БД (SQLite или PostgreSQL
+из DATABASE_ENGINE), заполняется синтетическими данными, после чего N потоков-клиентов получают JWT
+через `users/token/` и выполняют запросы сценариев к настоящим маршрутам через тестовый клиент Django
+(весь стек middleware, аутентификации и представлений, без сети). Результаты выводятся в JSON:
+
+    python -m benchmarks.api --entities 1000 10000 --depth 2 5 --concurrency 8 --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+
+from benchmarks import dataset  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+
+
+SCENARIOS = {
+    'token': lambda data, rng: ('post', '/users/token/', {'email': data['email'], 'password': data['password']}),
+    'network-list': lambda data, rng: ('get', '/api/network/', {}),
+    'network-list-filtered': lambda data, rng: ('get', '/api/network/', {'country': rng.choice(data['countries'])}),
+    'network-list-fields': lambda data, rng: ('get', '/api/network/', {'fields': 'id,name,debt,level'}),
+    'network-detail': lambda data, rng: ('get', f"/api/network/{rng.choice(data['entity_ids'])}/", {}),
+    'network-descendants': lambda data, rng: (
+        'get', f"/api/network/{rng.choice(data['entity_ids'])}/descendants/", {}
+    ),
+    'network-search': lambda data, rng: ('get', '/api/network/search/', {'q': rng.choice(data['search_terms'])}),
+    'debt-summary': lambda data, rng: ('get', '/api/network/debt/summary/', {}),
+    'product-list': lambda data, rng: ('get', '/prod/products/', {}),
+    'product-detail': lambda data, rng: ('get', f"/prod/products/{rng.choice(data['product_ids'])}/", {}),
+}
+
+
+class Worker:
+    """Клиент нагрузочного теста: получает JWT через API и выполняет запросы сценариев со своим токеном."""
+
+    def __init__(self, data, seed):
+        self.data = data
+        self.rng = random.Random(seed)
+        self.client = Client()
+        response = self.client.post('/users/token/', {'email': data['email'], 'password': data['password']})
+        if response.status_code != 200:
+            raise RuntimeError(f'Не удалось получить токен: {response.status_code}')
+        self.headers = {'Authorization': f"Bearer {response.json()['access']}"}
+
+    def request(self, scenario):
+        method, path, params = SCENARIOS[scenario](self.data, self.rng)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(path, params, headers=self.headers)
+            elapsed = time.perf_counter() - started
+        return elapsed, len(queries), response.status_code < 400
+
+
+def run_scenario(workers, scenario, requests, warmup):
+    """Выполняет `requests` запросов сценария клиентами в отдельных потоках после `warmup` запросов прогрева."""
+    latencies, query_counts = [], []
+    errors = 0
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def client(worker):
+        nonlocal errors
+        try:
+            for _ in range(warmup):
+                worker.request(scenario)
+            barrier.wait()
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        return
+                elapsed, queries, ok = worker.request(scenario)
+                with lock:
+                    latencies.append(elapsed)
+                    query_counts.append(queries)
+                    errors += not ok
+        finally:
+            connection.close()
+
+    barrier = threading.Barrier(len(workers) + 1)
+    with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+        futures = [executor.submit(client, worker) for worker in workers]
+        barrier.wait()
+        started = time.perf_counter()
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+
+    result = {'scenario': scenario, **summarize(latencies, elapsed, errors)}
+    result['queries_per_request'] = round(sum(query_counts) / len(query_counts), 2) if query_counts else 0.0
+    result['max_queries'] = max(query_counts, default=0)
+    return result
+
+
+def run(args):
+    setup_test_environment()
+    settings.RESPONSE_CACHE_ENABLED = not args.no_cache
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    runs = []
+    try:
+        for entities in args.entities:
+            for depth in args.depth:
+                call_command('flush', interactive=False, verbosity=0)
+                started = time.perf_counter()
+                data = dataset.build(entities, depth, args.products, seed=args.seed)
+                seed_seconds = round(time.perf_counter() - started, 2)
+                workers = [Worker(data, seed=index) for index in range(args.concurrency)]
+                results = [run_scenario(workers, scenario, args.requests, args.warmup) for scenario in args.scenarios]
+                runs.append({
+                    'entities': entities, 'depth': depth, 'products_per_entity': args.products,
+                    'seed_seconds': seed_seconds, 'results': results,
+                })
+                for result in results:
+                    print(f"{entities:>8} {depth:>3} {result['scenario']:<24} {result['rps']:>9} rps "
+                          f"p50 {result['p50_ms']:>8} p95 {result['p95_ms']:>8} p99 {result['p99_ms']:>8} ms "
+                          f"{result['queries_per_request']:>6} q/req", file=sys.stderr)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    return {
+        'meta': {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'response_cache': settings.RESPONSE_CACHE_ENABLED,
+            'fast_list': settings.FAST_LIST_ENDPOINTS,
+            'stateless_jwt': settings.JWT_STATELESS_AUTH,
+        },
+        'runs': runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест REST API.')
+    parser.add_argument('--entities', type=int, nargs='+', default=[1000], help='Размеры сети.')
+    parser.add_argument('--depth', type=int, nargs='+', default=[3], help='Глубины иерархии.')
+    parser.add_argument('--products', type=int, default=3, help='Продуктов у каждого объекта сети.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Число одновременных клиентов.')
+    parser.add_argument('--requests', type=int, default=200, help='Запросов на сценарий.')
+    parser.add_argument('--warmup', type=int, default=2, help='Запросов прогрева на клиента.')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-cache', action='store_true', help='Отключить кеш ответов.')
+    parser.add_argument('--output', help='Файл для результатов в JSON, по умолчанию stdout.')
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            stream.write(report)
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
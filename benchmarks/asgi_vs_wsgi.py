@@ -0,0 +1,117 @@
+"""
+Сравнение пропускной способности синхронных (WSGI) и асинхронных (ASGI) эндпоинтов чтения.
+
+Оба сервера запускаются отдельно на одной БД, например:
+
+    RESPONSE_CACHE_ENABLED=False gunicorn config.wsgi -w 1 --threads 8 -b 127.0.0.1:8000
+    uvicorn config.asgi:application --workers 1 --port 8001
+
+    python -m benchmarks.asgi_vs_wsgi --email admin@example.com --password secret \
+        --wsgi http://127.0.0.1:8000/api/network/ --asgi http://127.0.0.1:8001/async/api/network/
+
+Асинхронные эндпоинты не используют кеш ответов, поэтому WSGI-сервер должен быть запущен с
+RESPONSE_CACHE_ENABLED=False, иначе сравнивается чтение из кеша с запросами к БД. Перед прогоном скрипт
+проверяет, что ни один из адресов не отдает заголовок X-Cache, а в результатах считает его значения.
+
+Скрипт использует только стандартную библиотеку: N потоков-клиентов в течение заданного времени
+повторяют GET и считают запросы в секунду и перцентили задержки. Любое исключение клиента считается ошибкой.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import urljoin
+
+from benchmarks.stats import summarize
+
+
+def obtain_token(base_url, email, password):
+    request = urllib.request.Request(
+        urljoin(base_url, '/users/token/'),
+        data=json.dumps({'email': email, 'password': password}).encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)['access']
+
+
+def fetch(url, token):
+    """GET с токеном, возвращает значение заголовка X-Cache (None, если кеш ответов выключен)."""
+    request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+    with urllib.request.urlopen(request) as response:
+        response.read()
+        return response.headers.get('X-Cache')
+
+
+def ensure_uncached(url, token):
+    """Два запроса подряд: второй из включенного кеша был бы HIT, любое значение X-Cache означает кеш."""
+    states = {fetch(url, token) for _ in range(2)} - {None}
+    if states:
+        sys.exit(f'{url} отвечает с X-Cache: {", ".join(sorted(states))}. '
+                 f'Запустите сервер с RESPONSE_CACHE_ENABLED=False, иначе сравнение с ASGI некорректно.')
+
+
+def run(url, token, concurrency, duration):
+    deadline = time.monotonic() + duration
+    latencies, errors, cache_states = [], Counter(), Counter()
+    lock = threading.Lock()
+
+    def client():
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                state = fetch(url, token)
+            except HTTPError as exc:
+                with lock:
+                    errors[exc.code] += 1
+                continue
+            except Exception as exc:
+                with lock:
+                    errors[type(exc).__name__] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                cache_states[state or '-'] += 1
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(client) for _ in range(concurrency)]
+    elapsed = time.monotonic() - started
+    for future in futures:
+        # Исключения внутри клиента уже посчитаны, здесь остаются только ошибки самого скрипта
+        future.result()
+
+    return {
+        'url': url,
+        **summarize(latencies, elapsed, sum(errors.values())),
+        'error_kinds': {str(kind): count for kind, count in errors.items()},
+        'x_cache': dict(cache_states),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сравнение WSGI и ASGI эндпоинтов чтения.')
+    parser.add_argument('--wsgi', required=True, help='Адрес синхронного эндпоинта.')
+    parser.add_argument('--asgi', required=True, help='Адрес асинхронного эндпоинта.')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0, help='Длительность прогона в секундах.')
+    args = parser.parse_args()
+
+    tokens = {url: obtain_token(url, args.email, args.password) for url in (args.wsgi, args.asgi)}
+    for url, token in tokens.items():
+        ensure_uncached(url, token)
+
+    results = [run(url, token, args.concurrency, args.duration) for url, token in tokens.items()]
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Набор данных для нагрузочных тестов: сеть заданного размера и глубины из NetworkGenerator
+и пользователь с паролем для получения JWT. Модули Django импортируются после django.setup().
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from network.generator import COUNTRIES, ENTITY_NAMES, NetworkGenerator
+from network.models import NetworkEntity
+from products.models import Product
+
+
+BENCHMARK_EMAIL = 'benchmark@example.com'
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+def build(entities, depth, products_per_entity, seed=0):
+    """
+    Заполняет пустую БД и возвращает описание набора: учетные данные клиента, первичные ключи,
+    по которым сценарии выбирают детальные страницы, и поисковые запросы по названиям объектов.
+    """
+    for cache in caches.all():
+        cache.clear()
+
+    user = get_user_model().objects.create_user(email=BENCHMARK_EMAIL, password=BENCHMARK_PASSWORD)
+    NetworkGenerator([user.pk], depth=depth, products=products_per_entity, inherit_ratio=1, seed=seed).run(entities)
+
+    rows = list(NetworkEntity.objects.values_list('pk', 'supplier_type'))
+    return {
+        'email': BENCHMARK_EMAIL,
+        'password': BENCHMARK_PASSWORD,
+        'entity_ids': [pk for pk, _ in rows],
+        # Названия по шаблону NetworkGenerator ('Завод 12', 'ИП 40'), чтобы поиск находил существующие объекты
+        'search_terms': [f'{ENTITY_NAMES[supplier_type]} {pk}' for pk, supplier_type in rows],
+        'product_ids': list(Product.objects.values_list('pk', flat=True)),
+        'countries': COUNTRIES,
+    }
@@ -0,0 +1,15 @@
+import statistics
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Сводка прогона: число запросов, запросы в секунду и перцентили задержки в миллисекундах."""
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(quantiles[49] * 1000, 2) if quantiles else 0.0,
+        'p95_ms': round(quantiles[94] * 1000, 2) if quantiles else 0.0,
+        'p99_ms': round(quantiles[98] * 1000, 2) if quantiles else 0.0,
+    }
@@ -45,18 +45,25 @@ INSTALLED_APPS = [
     'network',
     'products',
     'users',
+    'monitoring',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
     'drf_yasg',
 ]
 
+# Триграммный поиск (lookup trigram_word_similar) доступен только на PostgreSQL
+if 'postgresql' in (os.getenv('DATABASE_ENGINE') or ''):
+    INSTALLED_APPS.append('django.contrib.postgres')
+
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -141,10 +148,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'users.User'
 
 
+# Режим аутентификации без обращения к БД: пользователь и его роли берутся из claims access-токена
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH') == 'True'
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication'
+        if JWT_STATELESS_AUTH else 'rest_framework_simplejwt.authentication.JWTAuthentication',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'network.paginators.IdCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
 SIMPLE_JWT = {
@@ -171,12 +184,61 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     'JTI_CLAIM': 'jti',
+    'TOKEN_USER_CLASS': 'users.authentication.RoleTokenUser',
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.RoleTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.RoleTokenRefreshSerializer',
 
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=50),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Время жизни кеша ролей пользователя между запросами в секундах, 0 - роли вычисляются заново в каждом запросе
+USER_ROLES_CACHE_TIMEOUT = int(os.getenv('USER_ROLES_CACHE_TIMEOUT', 0))
+
+# Кеш готовых ответов эндпоинтов чтения: LRU-вытеснение по MAX_ENTRIES и TTL в секундах.
+# В нем же хранятся версии данных для сброса ответов и ETag списков, поэтому при нескольких воркерах
+# бэкенд должен быть общим (RedisCache, DatabaseCache). LocMemCache по умолчанию подходит только
+# для разработки и тестов, при DEBUG=False `manage.py check --deploy` сообщает ошибку network.E001
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'True') == 'True'
+RESPONSE_CACHE_ALIAS = 'responses'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    RESPONSE_CACHE_ALIAS: {
+        'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'responses'),
+        'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 10000))},
+    },
+}
+
+# Роли пользователя кешируются в общем кеше ответов: сброс после смены групп должен видеть каждый воркер.
+# Процессный кеш при USER_ROLES_CACHE_TIMEOUT > 0 и DEBUG=False отклоняется `check --deploy` (users.E001)
+USER_ROLES_CACHE_ALIAS = os.getenv('USER_ROLES_CACHE_ALIAS', RESPONSE_CACHE_ALIAS)
+
+# Списки участников сети и продуктов собираются из .values() без сериализаторов
+FAST_LIST_ENDPOINTS = os.getenv('FAST_LIST_ENDPOINTS', 'True') == 'True'
+
+# Размер выдачи поиска по умолчанию и максимальный (параметр limit)
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+# Массовые действия админки: thread - фоновый поток, worker - процесс run_admin_jobs, sync - в запросе
+ADMIN_JOBS_MODE = os.getenv('ADMIN_JOBS_MODE', 'thread')
+ADMIN_JOBS_CHUNK_SIZE = int(os.getenv('ADMIN_JOBS_CHUNK_SIZE', 1000))
+
+# Метрики запросов на /metrics в формате Prometheus; при заданном токене сборщик передает его как Bearer
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Сколько самых долгих SQL-запросов хранить для каждого представления (админка, «Профили запросов»)
+SLOW_QUERIES_PER_VIEW = int(os.getenv('SLOW_QUERIES_PER_VIEW', 10))
+
+# Максимальное число продуктов, при котором они редактируются прямо в форме объекта сети
+ADMIN_INLINE_PRODUCTS_LIMIT = int(os.getenv('ADMIN_INLINE_PRODUCTS_LIMIT', 50))
+
 CORS_ALLOWED_ORIGINS = [
     "https://read-only.example.com",
     "https://read-and-write.example.com",
@@ -38,7 +38,11 @@ urlpatterns = [
     path('api/', include('network.urls')),
     path('users/', include('users.urls')),
     path('prod/', include('products.urls')),
+    # Асинхронные эндпоинты чтения для развертывания под ASGI (config.asgi)
+    path('async/api/', include('network.async_urls')),
+    path('async/prod/', include('products.async_urls')),
 
+    path('metrics', include('monitoring.urls')),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 ]
@@ -0,0 +1,77 @@
+import json
+
+from django.contrib import admin
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import RequestProfile
+from .profiling import slow_queries
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('id', 'created_at', 'method', 'path', 'view_name', 'status_code', 'duration_ms', 'query_count',
+                    'user', 'download_link')
+    list_filter = ('view_name', 'method')
+    list_select_related = ('user',)
+    readonly_fields = ('created_at', 'user', 'method', 'path', 'view_name', 'status_code', 'duration_ms',
+                       'query_count', 'db_time_ms', 'download_link', 'summary_text', 'sql_text')
+    exclude = ('duration', 'db_time', 'summary', 'stats', 'sql_log')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download_view),
+                 name='monitoring_requestprofile_download'),
+            path('slow-queries/', self.admin_site.admin_view(self.slow_queries_view),
+                 name='monitoring_requestprofile_slow_queries'),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        """Данные cProfile в формате pstats: `python -m pstats request-<id>.prof`, snakeviz и т. п."""
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        response = HttpResponse(bytes(profile.stats), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="request-{profile.pk}.prof"'
+        return response
+
+    def slow_queries_view(self, request):
+        """Самые долгие SQL-запросы процесса по представлениям."""
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        return JsonResponse(slow_queries.snapshot(), json_dumps_params={'ensure_ascii': False, 'indent': 2})
+
+    # Ссылка на скачивание данных pstats
+    def download_link(self, obj):
+        url = reverse('admin:monitoring_requestprofile_download', args=[obj.pk])
+        return format_html('<a href="{}">request-{}.prof</a>', url, obj.pk)
+
+    download_link.short_description = 'Профиль'
+
+    def duration_ms(self, obj):
+        return f'{obj.duration * 1000:.1f} мс'
+
+    duration_ms.short_description = 'Время обработки'
+
+    def db_time_ms(self, obj):
+        return f'{obj.db_time * 1000:.1f} мс'
+
+    db_time_ms.short_description = 'Время SQL'
+
+    def summary_text(self, obj):
+        return format_html('<pre>{}</pre>', obj.summary)
+
+    summary_text.short_description = 'Сводка профиля'
+
+    def sql_text(self, obj):
+        return format_html('<pre>{}</pre>', json.dumps(obj.sql_log, ensure_ascii=False, indent=2))
+
+    sql_text.short_description = 'Журнал SQL'
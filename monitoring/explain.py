@@ -0,0 +1,372 @@
+"""
+Аудит планов выполнения запросов представлений (команда explain_audit).
+
+Для каждого представления корневого URLconf строятся типичные запросы: первая страница списка,
+список с каждым фильтром filterset (значение берется из БД), поиск, выборка объекта по ключу
+и SQL-запросы perform_update, выполненного в откатываемой транзакции. Для каждого запроса
+выполняется EXPLAIN в настроенной БД и отмечаются полные просмотры таблиц, сортировки без индекса,
+фильтры по колонкам без индекса, а при EXPLAIN ANALYZE на PostgreSQL - расхождения оценки числа
+строк с фактическим. В отчет не попадают стоимости и время, поэтому отчеты разных версий сравниваются diff.
+"""
+import datetime
+import json
+import re
+from functools import partial
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, transaction
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.mixins import DestroyModelMixin, ListModelMixin, UpdateModelMixin
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from network.async_views import AsyncListView
+from network.cache import suspend_invalidation
+
+
+FULL_SCAN = 'full_scan'
+MISSING_INDEX = 'missing_index'
+ROW_ESTIMATE = 'row_estimate'
+SORT = 'sort'
+FINDING_KINDS = (FULL_SCAN, MISSING_INDEX, ROW_ESTIMATE, SORT)
+
+SKIPPED_NAMESPACES = ('admin',)
+EXPLAINED_STATEMENTS = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+BLOWUP_MIN_ROWS = 100  # Расхождения на меньшем числе строк не влияют на выбор плана
+PLAN_DETAILS = ('Index Cond', 'Recheck Cond', 'Hash Cond', 'Merge Cond', 'Join Filter', 'Filter', 'Sort Key')
+
+SQLITE_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW|SUBQUERY)(\w+)$')
+SQL_ALIAS = re.compile(r'"(\w+)" ([A-Z]\d+)\b')
+
+
+def iter_views(patterns=None, prefix='', namespace=None):
+    """Представления с get_queryset из URLconf: (имя URL, маршрут, класс, именованные параметры маршрута)."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace in SKIPPED_NAMESPACES:
+                continue
+            yield from iter_views(pattern.url_patterns, route, ':'.join(filter(None, (namespace, pattern.namespace))))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if view_class is not None and hasattr(view_class, 'get_queryset'):
+                name = f'{namespace}:{pattern.name}' if namespace else pattern.name
+                yield name, route, view_class, set(pattern.pattern.regex.groupindex)
+
+
+def view_model(view_class):
+    queryset = getattr(view_class, 'queryset', None)
+    if queryset is not None:
+        return queryset.model
+    serializer_class = getattr(view_class, 'serializer_class', None)
+    meta = getattr(serializer_class, 'Meta', None)
+    return getattr(meta, 'model', None)
+
+
+def indexed_columns(model):
+    """Колонки, с которых начинается хотя бы один индекс таблицы модели."""
+    opts = model._meta
+    columns = {opts.pk.column}
+    columns.update(field.column for field in opts.concrete_fields if field.db_index or field.unique)
+    for index in opts.indexes:
+        if index.fields:
+            columns.add(opts.get_field(index.fields[0].lstrip('-')).column)
+    for fields in opts.unique_together:
+        columns.add(opts.get_field(fields[0]).column)
+    for constraint in opts.constraints:
+        if getattr(constraint, 'fields', None):
+            columns.add(opts.get_field(constraint.fields[0]).column)
+    return columns
+
+
+def format_sample(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def finding(kind, table, detail=''):
+    return {'kind': kind, 'table': table, 'detail': detail}
+
+
+def sqlite_plan(rows, sql):
+    """
+    Строки EXPLAIN QUERY PLAN (id, parent, notused, detail) в виде дерева с отступами и замечания.
+    Просмотр таблицы без условий и сортировки под LIMIT останавливается после первых строк и не отмечается.
+    """
+    aliases = dict((alias, table) for table, alias in SQL_ALIAS.findall(sql))
+    bounded = ' LIMIT ' in sql and ' WHERE ' not in sql and not any('TEMP B-TREE' in row[3] for row in rows)
+    depths = {}
+    lines, findings = [], []
+    for node_id, parent, _, detail in rows:
+        depth = depths[node_id] = depths.get(parent, -1) + 1
+        lines.append('  ' * depth + detail)
+        match = SQLITE_SCAN.match(detail)
+        if match and not bounded:
+            findings.append(finding(FULL_SCAN, aliases.get(match[1], match[1])))
+        elif detail.startswith('USE TEMP B-TREE'):
+            findings.append(finding(SORT, '', detail))
+    return lines, findings
+
+
+def postgresql_plan(document, blowup_factor):
+    """
+    План EXPLAIN (FORMAT JSON) в виде дерева узлов без стоимостей и замечания.
+    Seq Scan без фильтра непосредственно под Limit читает только первые строки и не отмечается.
+    """
+    lines, findings = [], []
+
+    def walk(node, depth, bounded=False):
+        node_type = node['Node Type']
+        title = node_type
+        if 'Index Name' in node:
+            title += f" using {node['Index Name']}"
+        if 'Relation Name' in node:
+            title += f" on {node['Relation Name']}"
+        lines.append('  ' * depth + title)
+        for key in PLAN_DETAILS:
+            if key in node:
+                value = node[key]
+                lines.append('  ' * (depth + 1) + f"{key}: {', '.join(value) if isinstance(value, list) else value}")
+
+        table = node.get('Relation Name', '')
+        if node_type == 'Seq Scan' and not (bounded and 'Filter' not in node):
+            findings.append(finding(FULL_SCAN, table))
+        elif node_type in ('Sort', 'Incremental Sort'):
+            findings.append(finding(SORT, '', ', '.join(node.get('Sort Key', ()))))
+        if node.get('Actual Loops'):
+            estimated, actual = node['Plan Rows'], node['Actual Rows']
+            low, high = sorted((estimated, actual))
+            if high >= BLOWUP_MIN_ROWS and high >= blowup_factor * max(low, 1):
+                findings.append(finding(ROW_ESTIMATE, table, f'{title}: оценка {estimated}, фактически {actual}'))
+
+        for child in node.get('Plans', ()):
+            walk(child, depth + 1, node_type == 'Limit')
+
+    walk(document[0]['Plan'], 0)
+    return lines, findings
+
+
+class ExplainAudit:
+    """
+    Строит запросы представлений и собирает их планы. Запросы строятся методами самих представлений
+    (get_queryset, filter_queryset, perform_update), поэтому аудит следует за изменениями кода без настройки.
+    """
+
+    def __init__(self, user=None, analyze=False, blowup_factor=10, views=None):
+        self.user = user or AnonymousUser()
+        self.analyze = analyze and connection.vendor == 'postgresql'
+        self.blowup_factor = blowup_factor
+        self.views = set(views) if views else None
+        self.factory = APIRequestFactory()
+        self._samples = {}
+
+    def run(self):
+        entries = []
+        for name, route, view_class, url_kwargs in sorted(iter_views(), key=lambda item: item[0]):
+            if self.views is not None and name not in self.views:
+                continue
+            model = view_model(view_class)
+            if model is None:
+                continue
+            for case, build, columns in self.cases(view_class, model, url_kwargs):
+                entries.extend(self.explain_case(name, route, case, build, model, columns))
+        return entries
+
+    def cases(self, view_class, model, url_kwargs):
+        """Типичные запросы представления: (название, функция, возвращающая SQL, колонки условия)."""
+        opts = model._meta
+        lookup_url_kwarg = view_class.lookup_url_kwarg or view_class.lookup_field
+        kwargs = {}
+        if lookup_url_kwarg in url_kwargs:
+            kwargs[lookup_url_kwarg] = self.sample(model, opts.pk.attname) or 0
+        lookup_field = opts.pk if view_class.lookup_field == 'pk' else opts.get_field(view_class.lookup_field)
+        lookup_columns = (lookup_field.column,)
+        lookup = partial(self.lookup_statements, view_class, kwargs)
+
+        if hasattr(view_class, 'get'):
+            if kwargs and not issubclass(view_class, ListModelMixin):
+                yield 'retrieve', lookup, lookup_columns
+            else:
+                search_on = getattr(view_class, 'search_on', ())
+                if search_on:
+                    # Без строки поиска такие представления отвечают ошибкой, отдельного списка нет
+                    yield 'search', self.filter_case(view_class, kwargs, model, 'q', opts.get_field(search_on[0])), ()
+                else:
+                    yield 'list', partial(self.list_statements, view_class, kwargs), ()
+                filterset_class = getattr(view_class, 'filterset_class', None)
+                if filterset_class is not None:
+                    for filter_name, filter_ in sorted(filterset_class.base_filters.items()):
+                        field = opts.get_field(filter_.field_name)
+                        build = self.filter_case(view_class, kwargs, model, filter_name, field)
+                        yield f'filter:{filter_name}', build, (field.column,)
+        if issubclass(view_class, UpdateModelMixin):
+            yield 'update', lookup, lookup_columns
+            yield 'perform_update', partial(self.perform_update_statements, view_class, kwargs), ()
+        if issubclass(view_class, DestroyModelMixin):
+            yield 'destroy', lookup, lookup_columns
+
+    def filter_case(self, view_class, kwargs, model, param, field):
+        def build():
+            value = self.sample(model, field.attname)
+            if value is None:
+                raise LookupError(f'в колонке {field.column} нет значений для примера')
+            return self.list_statements(view_class, kwargs, {param: format_sample(value)})
+        return build
+
+    def explain_case(self, name, route, case, build, model, columns):
+        entry = {'view': name, 'route': route, 'case': case}
+        try:
+            statements = build()
+        except Exception as exc:
+            return [dict(entry, sql='', plan=[], findings=[], error=f'{type(exc).__name__}: {exc}')]
+
+        missing = [finding(MISSING_INDEX, model._meta.db_table, column) for column in columns
+                   if column not in indexed_columns(model)]
+        if not statements:
+            return [dict(entry, sql='', plan=[], findings=missing, error='')]
+        entries = []
+        for number, (sql, params) in enumerate(statements, 1):
+            statement_entry = dict(entry, case=f'{case}[{number}]' if len(statements) > 1 else case, sql=sql)
+            try:
+                plan, findings = self.explain(sql, params)
+            except Exception as exc:
+                entries.append(dict(statement_entry, plan=[], findings=missing, error=f'{type(exc).__name__}: {exc}'))
+                continue
+            unique = {tuple(item.values()): item for item in findings + missing}
+            statement_entry.update(plan=plan, findings=[unique[key] for key in sorted(unique)], error='')
+            entries.append(statement_entry)
+        return entries
+
+    def explain(self, sql, params):
+        vendor = connection.vendor
+        options = {}
+        if vendor == 'postgresql':
+            options['format'] = 'json'
+            if self.analyze and sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                options['analyze'] = True
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix(**options)} {sql}', params)
+            rows = cursor.fetchall()
+
+        if vendor == 'postgresql':
+            document = rows[0][0]
+            return postgresql_plan(json.loads(document) if isinstance(document, str) else document,
+                                   self.blowup_factor)
+        if vendor == 'sqlite':
+            return sqlite_plan(rows, sql)
+        return [' '.join(str(value) for value in row) for row in rows], []
+
+    def make_view(self, view_class, kwargs, params=None):
+        view = view_class()
+        view.request = Request(self.factory.get('/', params or {}))
+        view.request.user = self.user
+        view.args = ()
+        view.kwargs = kwargs
+        view.format_kwarg = None
+        return view
+
+    def sample(self, model, attname):
+        """
+        Непустое значение колонки у последнего созданного объекта - пример для фильтров и выборок.
+        Последний объект сети обычно лежит глубоко в иерархии, поэтому цепочка его поставщиков не пуста.
+        """
+        key = (model._meta.label_lower, attname)
+        if key not in self._samples:
+            self._samples[key] = (model._default_manager.exclude(**{f'{attname}__isnull': True})
+                                  .order_by('-pk').values_list(attname, flat=True).first())
+        return self._samples[key]
+
+    @staticmethod
+    def compile(queryset):
+        try:
+            return [queryset.query.get_compiler(queryset.db).as_sql()]
+        except EmptyResultSet:
+            return []  # Условие заведомо ложно, Django не отправляет запрос в БД
+
+    def list_statements(self, view_class, kwargs, params=None):
+        view = self.make_view(view_class, kwargs, params)
+        queryset = view.filter_queryset(view.get_queryset())
+        if issubclass(view_class, (ListModelMixin, AsyncListView)):
+            queryset = self.first_page(view, queryset)
+        return self.compile(queryset)
+
+    @staticmethod
+    def first_page(view, queryset):
+        """Порядок и размер первой страницы курсорной пагинации."""
+        if view.pagination_class is None or queryset.query.is_sliced:
+            return queryset
+        paginator = view.pagination_class()
+        ordering = getattr(paginator, 'ordering', None)
+        if ordering:
+            queryset = queryset.order_by(*((ordering,) if isinstance(ordering, str) else ordering))
+        page_size = getattr(paginator, 'page_size', None)
+        return queryset[:page_size + 1] if page_size else queryset
+
+    def lookup_statements(self, view_class, kwargs):
+        return self.compile(self.lookup_queryset(self.make_view(view_class, kwargs)))
+
+    @staticmethod
+    def lookup_queryset(view):
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        queryset = view.filter_queryset(view.get_queryset())
+        return queryset.filter(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+
+    def perform_update_statements(self, view_class, kwargs):
+        """
+        SQL-запросы perform_update при повторной отправке текущих значений объекта. Изменения откатываются,
+        EXPLAIN выполняется уже после отката, версии кеша ответов не меняются. Обновление выполняется от имени создателя объекта,
+        если он есть, чтобы пройти проверку владельца.
+        """
+        view = self.make_view(view_class, kwargs)
+        instance = self.lookup_queryset(view).get()
+        view.request.user = getattr(instance, 'creator', None) or self.user
+        serializer = view.get_serializer(instance, data=view.get_serializer(instance).data, partial=True)
+        serializer.is_valid(raise_exception=True)
+
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            if not many and sql.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+                statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        # Версии кеша ответов не откатываются вместе с транзакцией, поэтому сброс кеша отключен
+        with transaction.atomic(), suspend_invalidation():
+            with connection.execute_wrapper(capture):
+                view.perform_update(serializer)
+            transaction.set_rollback(True)
+        return statements
+
+
+def render_text(entries):
+    lines = [f'# explain_audit: {connection.vendor}']
+    for entry in entries:
+        lines.append('')
+        lines.append(f"{entry['view']} {entry['case']} /{entry['route']}")
+        if entry['error']:
+            lines.append(f"    ERROR {entry['error']}")
+        elif not entry['plan']:
+            lines.append('    (нет запросов к БД)')
+        lines.extend(f'    {line}' for line in entry['plan'])
+        for item in entry['findings']:
+            lines.append('    ! ' + ' '.join(filter(None, (item['kind'], item['table'], item['detail']))))
+    lines.append('')
+    lines.append('# ' + ', '.join(f'{kind}: {count}' for kind, count in count_findings(entries).items()))
+    return '\n'.join(lines) + '\n'
+
+
+def render_json(entries):
+    return json.dumps({'vendor': connection.vendor, 'entries': entries, 'findings': count_findings(entries)},
+                      ensure_ascii=False, indent=2, sort_keys=True) + '\n'
+
+
+def count_findings(entries):
+    counts = dict.fromkeys(FINDING_KINDS, 0)
+    for entry in entries:
+        for item in entry['findings']:
+            counts[item['kind']] += 1
+    return counts
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.explain import FINDING_KINDS, ExplainAudit, count_findings, render_json, render_text
+
+
+class Command(BaseCommand):
+    help = ('EXPLAIN типичных запросов всех представлений: полные просмотры таблиц, сортировки '
+            'и фильтры без индексов, ошибки оценки числа строк. Отчет предназначен для сравнения между версиями')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=('text', 'json'), default='text')
+        parser.add_argument('--output', help='Путь к файлу отчета, по умолчанию stdout')
+        parser.add_argument('--view', action='append', dest='views',
+                            help='Проверить только указанное представление (имя URL с пространством имен)')
+        parser.add_argument('--user', help='Email пользователя, от имени которого строятся запросы')
+        parser.add_argument('--analyze', action='store_true',
+                            help='EXPLAIN ANALYZE для SELECT на PostgreSQL: запросы выполняются, оценки строк '
+                                 'сравниваются с фактическими')
+        parser.add_argument('--blowup-factor', type=float, default=10,
+                            help='Во сколько раз оценка числа строк должна разойтись с фактическим')
+        parser.add_argument('--fail-on', action='append', choices=FINDING_KINDS, default=[],
+                            help='Завершиться с ошибкой, если в отчете есть замечания этого вида')
+
+    def handle(self, *args, **options):
+        audit = ExplainAudit(self.get_user(options['user']), analyze=options['analyze'],
+                             blowup_factor=options['blowup_factor'], views=options['views'])
+        entries = audit.run()
+        report = render_json(entries) if options['format'] == 'json' else render_text(entries)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                stream.write(report)
+        else:
+            self.stdout.write(report, ending='')
+
+        counts = count_findings(entries)
+        failed = {kind: counts[kind] for kind in options['fail_on'] if counts[kind]}
+        if failed:
+            raise CommandError('Найдены замечания: ' + ', '.join(f'{kind}: {count}' for kind, count in failed.items()))
+
+    @staticmethod
+    def get_user(email):
+        """Указанный пользователь или первый активный, суперпользователи в приоритете."""
+        User = get_user_model()
+        if email:
+            try:
+                return User._default_manager.get_by_natural_key(email)
+            except User.DoesNotExist:
+                raise CommandError(f'Пользователь {email} не найден.')
+        return User._default_manager.filter(is_active=True).order_by('-is_superuser', 'pk').first()
@@ -0,0 +1,241 @@
+"""
+Метрики запросов в памяти процесса и их вывод в текстовом формате Prometheus.
+
+Каждый поток пишет в собственный шард без блокировок, при сборе метрик шарды суммируются.
+Шарды завершившихся потоков сворачиваются в общий итог, поэтому счетчики не уменьшаются,
+а число шардов не растет с числом созданных потоков. При нескольких
+процессах-воркерах каждый процесс отдает свои значения, Prometheus различает их по instance.
+"""
+import heapq
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return str(value)
+
+
+def format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def new_state(self):
+        return [0]
+
+    def observe(self, state, value):
+        state[0] += value
+
+    def merge(self, total, state):
+        total[0] += state[0]
+
+    def samples(self, labels, state):
+        yield f'{self.name}{format_labels(self.labelnames, labels)} {format_value(state[0])}'
+
+
+class Histogram(Metric):
+    """Гистограмма: счетчики корзин хранятся некумулятивно и суммируются при выводе."""
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def new_state(self):
+        return [0] * (len(self.buckets) + 1) + [0.0, 0]  # корзины, +Inf, сумма, количество
+
+    def observe(self, state, value):
+        state[bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def merge(self, total, state):
+        for index, value in enumerate(state):
+            total[index] += value
+
+    def samples(self, labels, state):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), state):
+            cumulative += count
+            le = bound if bound == '+Inf' else format_value(float(bound))
+            yield f"{self.name}_bucket{format_labels(self.labelnames, labels, [('le', le)])} {cumulative}"
+        yield f'{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(state[-2])}'
+        yield f'{self.name}_count{format_labels(self.labelnames, labels)} {state[-1]}'
+
+
+class Registry:
+    """Набор метрик с шардами по потокам."""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+        self._local = threading.local()
+        self._shards = []  # (поток, шард)
+        self._retired = {}  # Сумма шардов завершившихся потоков
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def shard(self):
+        """Шард текущего потока: словарь (метрика, значения меток) -> состояние."""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead_shards(self):
+        """
+        Переносит шарды завершившихся потоков в общий итог, вызывается под блокировкой.
+        Завершившийся поток в свой шард больше не пишет, поэтому перенос не теряет наблюдений.
+        """
+        by_name = {metric.name: metric for metric in self.metrics}
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._merge(self._retired, shard, by_name)
+        self._shards = alive
+
+    @staticmethod
+    def _merge(totals, shard, by_name):
+        for (name, labels), state in shard.items():
+            metric = by_name[name]
+            total = totals.setdefault((name, labels), metric.new_state())
+            metric.merge(total, list(state))
+
+    def observe(self, metric, labels, value, shard=None):
+        shard = self.shard() if shard is None else shard
+        key = (metric.name, labels)
+        state = shard.get(key)
+        if state is None:
+            state = shard[key] = metric.new_state()
+        metric.observe(state, value)
+
+    def collect(self):
+        """Суммирует шарды. Копия словаря шарда атомарна под GIL, поэтому запись в него не блокируется."""
+        with self._lock:
+            self._retire_dead_shards()
+            shards = [shard for _, shard in self._shards]
+            totals = {key: list(state) for key, state in self._retired.items()}
+        by_name = {metric.name: metric for metric in self.metrics}
+        for shard in shards:
+            self._merge(totals, shard.copy(), by_name)
+        return totals
+
+    def render(self):
+        totals = self.collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for (name, labels), state in sorted(totals.items()):
+                if name == metric.name:
+                    lines.extend(metric.samples(labels, state))
+        for collector in self.collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._retired.clear()
+            for _, shard in self._shards:
+                shard.clear()
+
+
+registry = Registry()
+
+REQUESTS = registry.register(Counter(
+    'http_requests_total', 'Количество запросов по представлению, методу и статусу ответа.',
+    ('view', 'method', 'status'),
+))
+LATENCY = registry.register(Histogram(
+    'http_request_duration_seconds', 'Время обработки запроса в секундах.', ('view', 'method'), LATENCY_BUCKETS,
+))
+DB_QUERIES = registry.register(Histogram(
+    'http_request_db_queries', 'Количество SQL-запросов на запрос.', ('view', 'method'), QUERY_BUCKETS,
+))
+DB_DURATION = registry.register(Histogram(
+    'http_request_db_duration_seconds', 'Время SQL-запросов на запрос в секундах.', ('view', 'method'),
+    LATENCY_BUCKETS,
+))
+RESPONSE_SIZE = registry.register(Histogram(
+    'http_response_size_bytes', 'Размер тела ответа в байтах (без потоковых ответов).', ('view', 'method'),
+    SIZE_BUCKETS,
+))
+RESPONSE_CACHE_REQUESTS = registry.register(Counter(
+    'response_cache_requests_total', 'Обращения к кешу ответов по результату.', ('result',),
+))
+
+
+class RequestStats:
+    """
+    Счетчики SQL текущего запроса и slow_limit самых долгих запросов (куча по времени).
+    Полный журнал (время, SQL, параметры) ведется, только если его включили (профилирование),
+    поэтому память запроса не растет с числом SQL-запросов, например при потоковом импорте.
+    Передаются через contextvar, поэтому видны и из sync_to_async.
+    """
+    __slots__ = ('queries', 'db_time', 'log', 'slowest', 'slow_limit')
+
+    def __init__(self, slow_limit=0):
+        self.queries = 0
+        self.db_time = 0.0
+        self.log = None
+        self.slowest = []
+        self.slow_limit = slow_limit
+
+    def add(self, duration, sql, params):
+        self.queries += 1
+        self.db_time += duration
+        if self.log is not None:
+            self.log.append((duration, sql, params))
+        # Номер запроса разрешает равенство времени, SQL и параметры не сравниваются
+        if len(self.slowest) < self.slow_limit:
+            heapq.heappush(self.slowest, (duration, self.queries, sql, params))
+        elif self.slowest and duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, self.queries, sql, params))
+
+    def slowest_queries(self):
+        return [(duration, sql, params) for duration, _, sql, params in self.slowest]
+
+
+current_request = ContextVar('monitoring_request_stats', default=None)
+
+
+def record_request(view, method, status, duration, stats, size=None):
+    shard = registry.shard()
+    registry.observe(REQUESTS, (view, method, str(status)), 1, shard)
+    labels = (view, method)
+    registry.observe(LATENCY, labels, duration, shard)
+    registry.observe(DB_QUERIES, labels, stats.queries, shard)
+    registry.observe(DB_DURATION, labels, stats.db_time, shard)
+    if size is not None:
+        registry.observe(RESPONSE_SIZE, labels, size, shard)
@@ -0,0 +1,135 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from .metrics import RequestStats, current_request, record_request
+from .profiling import RequestProfiler, get_staff_user, profiling_requested, slow_queries
+
+
+class MetricsMiddleware:
+    """
+    Записывает время обработки, число и время SQL-запросов, размер и статус ответа
+    по имени представления (`network:networkentity-list`, `users:token_obtain_pair`),
+    а самые долгие SQL-запросы - в журнал медленных запросов.
+    Работает и в синхронном, и в асинхронном стеке, не переводя асинхронные представления в поток.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        stats = RequestStats(settings.SLOW_QUERIES_PER_VIEW)
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.record(request, response, time.perf_counter() - started, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+        stats = RequestStats(settings.SLOW_QUERIES_PER_VIEW)
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.record(request, response, time.perf_counter() - started, stats)
+        return response
+
+    @staticmethod
+    def record(request, response, duration, stats):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else 'unresolved'
+        size = None if response.streaming else len(response.content)
+        record_request(view, request.method, response.status_code, duration, stats, size)
+        slow_queries.record(view, stats.slowest_queries())
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует запрос сотрудника с заголовком X-Profile или параметром `_profile` и сохраняет RequestProfile.
+    Идентификатор профиля возвращается в заголовке X-Profile-Id. Ставится после AuthenticationMiddleware,
+    чтобы учитывать сессию админки. В асинхронном стеке cProfile видит только поток цикла событий,
+    а SQL асинхронного ORM попадает в журнал запроса.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not profiling_requested(request):
+            return self.get_response(request)
+        user = get_staff_user(request)
+        if user is None:
+            return self.get_response(request)
+
+        stats, token = self.get_stats()
+        profiler = RequestProfiler(stats)
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+            if token is not None:
+                current_request.reset(token)
+        profile = self.save(profiler, request, response, user)
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
+
+    async def __acall__(self, request):
+        if not profiling_requested(request):
+            return await self.get_response(request)
+        user = await sync_to_async(get_staff_user)(request)
+        if user is None:
+            return await self.get_response(request)
+
+        stats, token = self.get_stats()
+        profiler = RequestProfiler(stats)
+        profiler.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.stop()
+            if token is not None:
+                current_request.reset(token)
+        profile = await sync_to_async(self.save)(profiler, request, response, user)
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
+
+    @staticmethod
+    def get_stats():
+        """Журнал SQL запроса: общий с MetricsMiddleware или собственный, если метрики отключены."""
+        stats = current_request.get()
+        if stats is not None:
+            return stats, None
+        stats = RequestStats()
+        return stats, current_request.set(stats)
+
+    @staticmethod
+    def save(profiler, request, response, user):
+        # Сохранение профиля не попадает в метрики и журнал SQL самого запроса
+        token = current_request.set(None)
+        try:
+            return profiler.save(request, response, user)
+        finally:
+            current_request.reset(token)
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='время запроса')),
+                ('method', models.CharField(max_length=10, verbose_name='метод')),
+                ('path', models.TextField(verbose_name='адрес')),
+                ('view_name', models.CharField(max_length=200, verbose_name='представление')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='статус ответа')),
+                ('duration', models.FloatField(verbose_name='время обработки, с')),
+                ('query_count', models.PositiveIntegerField(verbose_name='SQL-запросов')),
+                ('db_time', models.FloatField(verbose_name='время SQL, с')),
+                ('summary', models.TextField(verbose_name='сводка профиля')),
+                ('stats', models.BinaryField(verbose_name='данные pstats')),
+                ('sql_log', models.JSONField(default=list, verbose_name='журнал SQL')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+            ],
+            options={
+                'verbose_name': 'Профиль запроса',
+                'verbose_name_plural': 'Профили запросов',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
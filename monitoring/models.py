@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+
+User = get_user_model()
+
+NULLABLE = {'blank': True, 'null': True}
+
+
+class RequestProfile(models.Model):
+    """
+    Профиль одного запроса, запрошенного сотрудником заголовком X-Profile или параметром `_profile`.
+    Хранит данные cProfile в формате pstats, сводку самых затратных функций и журнал SQL с временем.
+    """
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='время запроса')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, verbose_name='пользователь', **NULLABLE)
+    method = models.CharField(max_length=10, verbose_name='метод')
+    path = models.TextField(verbose_name='адрес')
+    view_name = models.CharField(max_length=200, verbose_name='представление')
+    status_code = models.PositiveSmallIntegerField(verbose_name='статус ответа')
+    duration = models.FloatField(verbose_name='время обработки, с')
+    query_count = models.PositiveIntegerField(verbose_name='SQL-запросов')
+    db_time = models.FloatField(verbose_name='время SQL, с')
+    summary = models.TextField(verbose_name='сводка профиля')
+    stats = models.BinaryField(verbose_name='данные pstats')
+    sql_log = models.JSONField(default=list, verbose_name='журнал SQL')
+
+    class Meta:
+        verbose_name = 'Профиль запроса'
+        verbose_name_plural = 'Профили запросов'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.method} {self.path} #{self.pk}'
@@ -0,0 +1,157 @@
+"""
+Профилирование отдельных запросов по требованию и журнал самых медленных SQL-запросов.
+
+Сотрудник (is_staff) включает профилирование заголовком `X-Profile: 1` или параметром `?_profile=1`:
+запрос выполняется под cProfile, результат вместе с журналом SQL сохраняется в RequestProfile
+и скачивается из админки в формате pstats. Журнал медленных запросов работает всегда и хранит
+для каждого представления N самых долгих SQL-запросов.
+"""
+import cProfile
+import heapq
+import io
+import itertools
+import marshal
+import pstats
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+
+from .models import RequestProfile
+
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_PARAM = '_profile'
+SUMMARY_LINES = 40
+PARAMS_MAX_LENGTH = 1000
+
+
+def profiling_requested(request):
+    return request.headers.get(PROFILE_HEADER) == '1' or request.GET.get(PROFILE_QUERY_PARAM) == '1'
+
+
+def get_staff_user(request):
+    """
+    Возвращает сотрудника, отправившего запрос, или None. Пользователь берется из сессии админки
+    или из JWT; флаг is_staff проверяется по БД, так как в токене его нет.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        user = None
+        for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            try:
+                result = authentication_class().authenticate(request)
+            except APIException:
+                return None
+            if result is not None:
+                user = result[0]
+                break
+    if user is None:
+        return None
+    return get_user_model().objects.filter(pk=user.pk, is_staff=True, is_active=True).first()
+
+
+def format_params(params):
+    text = repr(params)
+    return text if len(text) <= PARAMS_MAX_LENGTH else text[:PARAMS_MAX_LENGTH] + '...'
+
+
+def sql_entries(log):
+    return [{'time_ms': round(duration * 1000, 3), 'sql': sql, 'params': format_params(params)}
+            for duration, sql, params in log]
+
+
+class RequestProfiler:
+    """cProfile и журнал SQL одного запроса."""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.profiler = cProfile.Profile()
+        # Полный журнал SQL ведется только для профилируемого запроса
+        if stats.log is None:
+            stats.log = []
+        self.start_index = len(stats.log)
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.duration = time.perf_counter() - self.started
+
+    def save(self, request, response, user):
+        stream = io.StringIO()
+        profile_stats = pstats.Stats(self.profiler, stream=stream)
+        profile_stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LINES)
+        log = self.stats.log[self.start_index:]
+        match = getattr(request, 'resolver_match', None)
+        return RequestProfile.objects.create(
+            user=user,
+            method=request.method,
+            path=request.get_full_path(),
+            view_name=match.view_name if match is not None else 'unresolved',
+            status_code=response.status_code,
+            duration=self.duration,
+            query_count=len(log),
+            db_time=sum(duration for duration, _, _ in log),
+            summary=stream.getvalue(),
+            stats=marshal.dumps(profile_stats.stats),
+            sql_log=sql_entries(log),
+        )
+
+
+class SlowQueryLog:
+    """
+    Ограниченный журнал: для каждого представления хранится SLOW_QUERIES_PER_VIEW самых долгих запросов
+    (куча по времени, самый быстрый из сохраненных вытесняется первым). Запросы быстрее уже сохраненных
+    отбрасываются без блокировки, поэтому в обычном запросе журнал почти ничего не стоит.
+    """
+
+    def __init__(self):
+        self._heaps = {}
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def record(self, view, log):
+        size = settings.SLOW_QUERIES_PER_VIEW
+        heap = self._heaps.get(view)
+        threshold = heap[0][0] if heap is not None and len(heap) >= size else -1.0
+        candidates = [entry for entry in log if entry[0] > threshold]
+        if not candidates or size <= 0:
+            return
+        recorded_at = time.time()
+        with self._lock:
+            heap = self._heaps.setdefault(view, [])
+            for duration, sql, params in candidates:
+                if len(heap) >= size and duration <= heap[0][0]:
+                    continue
+                item = (duration, next(self._counter), sql, format_params(params), recorded_at)
+                if len(heap) < size:
+                    heapq.heappush(heap, item)
+                else:
+                    heapq.heapreplace(heap, item)
+
+    def snapshot(self):
+        """Сохраненные запросы по представлениям, от самого медленного."""
+        with self._lock:
+            heaps = {view: list(heap) for view, heap in self._heaps.items()}
+        return {
+            view: [
+                {'time_ms': round(duration * 1000, 3), 'sql': sql, 'params': params,
+                 'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(recorded_at))}
+                for duration, _, sql, params, recorded_at in sorted(heap, reverse=True)
+            ]
+            for view, heap in sorted(heaps.items())
+        }
+
+    def reset(self):
+        with self._lock:
+            self._heaps.clear()
+
+
+slow_queries = SlowQueryLog()
@@ -0,0 +1,28 @@
+import time
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .metrics import current_request
+
+
+def count_query(execute, sql, params, many, context):
+    """Обертка выполнения SQL: считает запросы и их время для текущего HTTP-запроса."""
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add(time.perf_counter() - started, sql, params)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    """
+    Обертка ставится на каждое соединение один раз при подключении, а не в каждом запросе:
+    асинхронный ORM выполняет запросы в другом потоке с другим соединением.
+    """
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
@@ -0,0 +1,315 @@
+import json
+import marshal
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from network.cache import get_versions, list_version_key, object_version_key
+from network.models import NetworkEntity
+from products.models import Product
+from users.authentication import RoleRefreshToken
+from .explain import FULL_SCAN, ROW_ESTIMATE, SORT, postgresql_plan, sqlite_plan
+from .metrics import LATENCY, REQUESTS, Histogram, Registry, RequestStats, registry
+from .models import RequestProfile
+from .profiling import slow_queries
+
+
+User = get_user_model()
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsMiddlewareTests(TestCase):
+    """
+    Тесты сбора метрик запросов и эндпоинта /metrics.
+    """
+    metrics_auth = {'Authorization': 'Bearer secret'}
+
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(email='user@test.com', password='password123')
+        self.auth = {'Authorization': f'Bearer {RoleRefreshToken.for_user(self.user).access_token}'}
+        NetworkEntity.objects.create(creator=self.user, name='Завод', email='factory@test.com', country='Россия',
+                                     supplier_type=0)
+
+    def test_metrics_per_view(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('network:networkentity-list'), headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        query_count = len(queries)
+        self.client.get(reverse('network:networkentity-detail', args=[0]), headers=self.auth)
+
+        response = self.client.get('/metrics', headers=self.metrics_auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        labels = 'view="network:networkentity-list",method="GET"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 1', body)
+        self.assertIn('http_requests_total{view="network:networkentity-detail",method="GET",status="404"} 1', body)
+        self.assertIn(f'http_request_db_queries_sum{{{labels}}} {query_count}', body)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', body)
+        self.assertIn(f'http_response_size_bytes_count{{{labels}}} 1', body)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('response_cache_requests_total{result="miss"}', body)
+
+    async def test_async_view_queries_counted(self):
+        response = await self.async_client.get(reverse('network_async:networkentity-list'), headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = await self.async_client.get('/metrics', headers=self.metrics_auth)
+        body = response.content.decode()
+        labels = 'view="network_async:networkentity-list",method="GET"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 1', body)
+        self.assertNotIn(f'http_request_db_queries_sum{{{labels}}} 0\n', body)
+
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get('/metrics', headers=self.metrics_auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_without_token_only_in_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_200_OK)
+
+
+class RegistryTests(TestCase):
+    """
+    Тесты хранения метрик по потокам.
+    """
+    def test_concurrent_observations(self):
+        local_registry = Registry()
+        requests = local_registry.register(REQUESTS)
+        latency = local_registry.register(LATENCY)
+
+        def worker():
+            for _ in range(1000):
+                local_registry.observe(requests, ('view', 'GET', '200'), 1)
+                local_registry.observe(latency, ('view', 'GET'), 0.02)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        totals = local_registry.collect()
+        self.assertEqual(totals[(requests.name, ('view', 'GET', '200'))], [8000])
+        self.assertEqual(totals[(latency.name, ('view', 'GET'))][-1], 8000)
+
+    def test_dead_thread_shards_are_folded(self):
+        local_registry = Registry()
+        requests = local_registry.register(REQUESTS)
+
+        def worker():
+            local_registry.observe(requests, ('view', 'GET', '200'), 1)
+
+        for _ in range(20):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+        local_registry.observe(requests, ('view', 'GET', '200'), 1)
+
+        totals = local_registry.collect()
+        self.assertEqual(totals[(requests.name, ('view', 'GET', '200'))], [21])
+        self.assertEqual(len(local_registry._shards), 1)
+        self.assertEqual(local_registry.collect(), totals)
+
+    def test_histogram_buckets_cumulative(self):
+        local_registry = Registry()
+        histogram = local_registry.register(Histogram('sizes', 'Размеры.', ('view',), (10, 100)))
+        for value in (5, 10, 50, 500):
+            local_registry.observe(histogram, ('a"b',), value)
+
+        self.assertEqual(local_registry.render().splitlines()[2:], [
+            'sizes_bucket{view="a\\"b",le="10"} 2',
+            'sizes_bucket{view="a\\"b",le="100"} 3',
+            'sizes_bucket{view="a\\"b",le="+Inf"} 4',
+            'sizes_sum{view="a\\"b"} 565',
+            'sizes_count{view="a\\"b"} 4',
+        ])
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, SLOW_QUERIES_PER_VIEW=2)
+class ProfilingTests(TestCase):
+    """
+    Тесты профилирования запросов по требованию и журнала медленных SQL-запросов.
+    """
+    def setUp(self):
+        slow_queries.reset()
+        self.staff = User.objects.create_superuser(email='staff@test.com', password='password123')
+        self.user = User.objects.create_user(email='user@test.com', password='password123')
+        NetworkEntity.objects.create(creator=self.user, name='Завод', email='factory@test.com', country='Россия',
+                                     supplier_type=0)
+        self.url = reverse('network:networkentity-list')
+
+    def auth(self, user):
+        return {'Authorization': f'Bearer {RoleRefreshToken.for_user(user).access_token}'}
+
+    def test_staff_profile_with_header(self):
+        response = self.client.get(self.url, headers={**self.auth(self.staff), 'X-Profile': '1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual((profile.user, profile.view_name, profile.status_code),
+                         (self.staff, 'network:networkentity-list', 200))
+        self.assertEqual(profile.query_count, len(profile.sql_log))
+        self.assertGreater(profile.query_count, 0)
+        self.assertIn('network_networkentity', ' '.join(entry['sql'] for entry in profile.sql_log))
+        self.assertIn('cumulative', profile.summary)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('admin:monitoring_requestprofile_download', args=[profile.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(marshal.loads(response.content), dict)
+        response = self.client.get(reverse('admin:monitoring_requestprofile_change', args=[profile.pk]))
+        self.assertContains(response, 'network_networkentity')
+
+    def test_staff_session_profile_with_query_flag(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('admin:network_networkentity_changelist'), {'_profile': '1'})
+        self.assertIn('X-Profile-Id', response)
+
+    def test_non_staff_not_profiled(self):
+        response = self.client.get(self.url, headers={**self.auth(self.user), 'X-Profile': '1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Profile-Id', response)
+        self.client.get(self.url, {'_profile': '1'})
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_slow_query_log_keeps_worst(self):
+        slow_queries.record('view', [(0.5, 'SELECT 1', ()), (0.1, 'SELECT 2', ()), (0.9, 'SELECT 3', (1,))])
+        slow_queries.record('view', [(0.2, 'SELECT 4', ()), (0.7, 'SELECT 5', ())])
+        self.assertEqual([(entry['sql'], entry['time_ms']) for entry in slow_queries.snapshot()['view']],
+                         [('SELECT 3', 900.0), ('SELECT 5', 700.0)])
+
+        self.client.get(self.url, headers=self.auth(self.user))
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('admin:monitoring_requestprofile_slow_queries'))
+        self.assertEqual(len(response.json()['network:networkentity-list']), 2)
+
+    @override_settings(SLOW_QUERIES_PER_VIEW=1)
+    def test_request_keeps_only_slowest_queries(self):
+        stats = RequestStats(2)
+        for duration in (0.3, 0.1, 0.5, 0.2):
+            stats.add(duration, 'SELECT 1', ())
+        self.assertEqual(sorted(duration for duration, _, _ in stats.slowest_queries()), [0.3, 0.5])
+        self.assertEqual((stats.queries, stats.log), (4, None))
+
+        created = []
+
+        def make_stats(*args):
+            created.append(RequestStats(*args))
+            return created[-1]
+
+        with mock.patch('monitoring.middleware.RequestStats', side_effect=make_stats):
+            self.client.get(self.url, headers=self.auth(self.user))
+        stats, = created
+        self.assertGreater(stats.queries, 1)
+        self.assertIsNone(stats.log)
+        self.assertEqual(len(stats.slowest_queries()), 1)
+
+
+class ExplainAuditTests(TestCase):
+    """
+    Тесты команды explain_audit и разбора планов.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@test.com', password='password123')
+        factory = NetworkEntity.objects.create(creator=self.user, name='Завод', email='factory@test.com',
+                                               country='Россия', supplier_type=0)
+        self.retail = NetworkEntity.objects.create(creator=self.user, name='Сеть', email='retail@test.com',
+                                                   country='Россия', supplier=factory, supplier_type=1, debt=100)
+        Product.objects.create(creator=self.user, network_entity=factory, name='Телефон', model='M1',
+                               release_date='2020-01-01')
+
+    def audit(self, *args):
+        output = StringIO()
+        call_command('explain_audit', '--format', 'json', *args, stdout=output)
+        return json.loads(output.getvalue())
+
+    def test_report_covers_views(self):
+        report = self.audit()
+        cases = {(entry['view'], entry['case']): entry for entry in report['entries']}
+        for key in [('network:networkentity-list', 'list'), ('network:networkentity-list', 'filter:country'),
+                    ('network:networkentity-detail', 'retrieve'), ('network:networkentity-update', 'update'),
+                    ('network:networkentity-search', 'search'), ('products:product-list', 'filter:release_date'),
+                    ('network_async:networkentity-list', 'filter:country'), ('users:user_delete', 'destroy')]:
+            self.assertIn(key, cases)
+            self.assertEqual(cases[key]['error'], '')
+            self.assertTrue(cases[key]['plan'])
+        self.assertFalse(any(view.startswith('admin:') for view, _ in cases))
+        self.assertTrue(any(case.startswith('perform_update') for view, case in cases
+                            if view == 'network:networkentity-update'))
+        self.assertEqual(report['findings']['missing_index'], 0)
+
+    def test_country_filter_served_by_index_in_page_order(self):
+        report = self.audit('--view', 'network:networkentity-list')
+        entry = next(entry for entry in report['entries'] if entry['case'] == 'filter:country')
+        self.assertEqual(entry['findings'], [])
+        if connection.vendor == 'sqlite':
+            self.assertIn('network_country_idx', entry['plan'][0])
+
+    def test_report_is_stable_and_read_only(self):
+        updated_at = NetworkEntity.objects.get(pk=self.retail.pk).updated_at
+        label = NetworkEntity._meta.label_lower
+        version_keys = [list_version_key(label), object_version_key(label, self.retail.pk)]
+        versions = get_versions(version_keys)
+        first = self.audit()
+        self.assertEqual(self.audit(), first)
+        self.assertEqual(NetworkEntity.objects.get(pk=self.retail.pk).updated_at, updated_at)
+        self.assertEqual(get_versions(version_keys), versions)
+
+    def test_view_filter_and_text_format(self):
+        output = StringIO()
+        call_command('explain_audit', '--view', 'network:networkentity-detail', stdout=output)
+        lines = output.getvalue().splitlines()
+        self.assertIn('network:networkentity-detail retrieve /api/network/<int:pk>/', lines)
+        self.assertFalse(any(line.startswith('network:networkentity-list') for line in lines))
+
+    def test_fail_on(self):
+        self.audit('--view', 'network:networkentity-detail', '--fail-on', 'full_scan')
+        with self.assertRaises(CommandError):
+            call_command('explain_audit', '--view', 'network:networkentity-export', '--fail-on', 'full_scan',
+                         stdout=StringIO())
+
+    def test_sqlite_plan(self):
+        rows = [(2, 0, 0, 'SEARCH network_networkentity USING INDEX network_country_city_idx (country=?)'),
+                (6, 0, 0, 'LIST SUBQUERY 1'), (8, 6, 0, 'SCAN U0'), (30, 0, 0, 'USE TEMP B-TREE FOR ORDER BY')]
+        lines, findings = sqlite_plan(rows, 'SELECT * FROM "network_networkentity" WHERE "id" IN '
+                                            '(SELECT U0."id" FROM "products_product" U0)')
+        self.assertEqual(lines[2], '  SCAN U0')
+        self.assertEqual([(item['kind'], item['table']) for item in findings],
+                         [(FULL_SCAN, 'products_product'), (SORT, '')])
+
+        _, findings = sqlite_plan([(2, 0, 0, 'SCAN users_user')], 'SELECT * FROM "users_user" LIMIT 51')
+        self.assertEqual(findings, [])
+
+    def test_postgresql_plan(self):
+        document = [{'Plan': {
+            'Node Type': 'Limit', 'Plan Rows': 51, 'Actual Rows': 51, 'Actual Loops': 1, 'Plans': [{
+                'Node Type': 'Sort', 'Sort Key': ['created_at', 'id'], 'Plan Rows': 10, 'Actual Rows': 5000,
+                'Actual Loops': 1, 'Plans': [{
+                    'Node Type': 'Seq Scan', 'Relation Name': 'network_networkentity', 'Filter': "(city = 'Москва')",
+                    'Plan Rows': 10, 'Actual Rows': 5000, 'Actual Loops': 1,
+                }],
+            }],
+        }}]
+        lines, findings = postgresql_plan(document, blowup_factor=10)
+        self.assertEqual(lines, ['Limit', '  Sort', '    Sort Key: created_at, id',
+                                 '    Seq Scan on network_networkentity', "      Filter: (city = 'Москва')"])
+        self.assertEqual([(item['kind'], item['table']) for item in findings],
+                         [(SORT, ''), (ROW_ESTIMATE, ''), (FULL_SCAN, 'network_networkentity'),
+                          (ROW_ESTIMATE, 'network_networkentity')])
+
+        bounded = [{'Plan': {'Node Type': 'Limit', 'Plan Rows': 51, 'Plans': [
+            {'Node Type': 'Seq Scan', 'Relation Name': 'users_user', 'Plan Rows': 51}]}}]
+        self.assertEqual(postgresql_plan(bounded, blowup_factor=10)[1], [])
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from .apps import MonitoringConfig
+from .views import MetricsView
+
+
+app_name = MonitoringConfig.name
+
+urlpatterns = [
+    path('', MetricsView.as_view(), name='metrics'),
+]
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+
+from .metrics import registry
+
+
+class MetricsView(View):
+    """
+    Метрики процесса в текстовом формате Prometheus. Если задан METRICS_TOKEN,
+    сборщик должен передать его в заголовке `Authorization: Bearer <токен>`.
+    Без токена метрики (имена представлений и нагрузка на них) отдаются только при DEBUG.
+    """
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if not token:
+            if not settings.DEBUG:
+                return HttpResponse(status=403)
+        elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=401)
+        return HttpResponse(registry.render(), content_type=self.content_type)
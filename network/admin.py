@@ -1,19 +1,34 @@
+from django.conf import settings
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from products.models import Product
-from .models import NetworkEntity
+from .jobs import enqueue_job
+from .models import AdminJob, NetworkEntity
+from .paginators import EstimatedCountPaginator
+from .search import ENTITY_SEARCH_FIELDS, search
 
 
 class ProductInline(admin.TabularInline):
     model = Product
     extra = 1
+    raw_id_fields = ('creator',)
 
 
-@admin.action(description='Очистить задолженность перед поставщиком')
-def clear_supplier_debt(self, request, queryset):
-    updated_count = queryset.update(debt=0)
-    self.message_user(request, f'Задолженность перед поставщиком очищена для {updated_count} объектов.')
+def job_action(job_name, description):
+    """Создает действие админки, которое выполняет зарегистрированную задачу пачками в фоне."""
+    @admin.action(description=description)
+    def action(modeladmin, request, queryset):
+        job = enqueue_job(job_name, queryset, request.user)
+        url = reverse('admin:network_adminjob_change', args=[job.pk])
+        modeladmin.message_user(request, format_html(
+            'Задача «{}» запущена для {} объектов. <a href="{}">Прогресс выполнения</a>', description, job.total, url
+        ))
+    action.__name__ = job_name
+    return action
+
+
+clear_supplier_debt = job_action('clear_supplier_debt', 'Очистить задолженность перед поставщиком')
 
 
 @admin.register(NetworkEntity)
@@ -21,10 +36,36 @@ class NetworkEntityAdmin(admin.ModelAdmin):
     list_display = (
         'name', 'creator', 'email', 'country', 'city', 'street', 'building_number', 'supplier_link', 'debt', 'created_at', 'level')
     list_filter = ('city',)
-    search_fields = ('name', 'city', 'country', 'creator',)
-    readonly_fields = ('created_at',)
+    list_select_related = ('supplier', 'creator')
+    search_fields = ENTITY_SEARCH_FIELDS + ('creator__email',)
+    readonly_fields = ('created_at', 'products_link')
+    autocomplete_fields = ('supplier', 'creator')
     inlines = [ProductInline]
     actions = [clear_supplier_debt]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск в списке и в автодополнении поставщика идет по триграммным индексам,
+        # email создателя ищется вхождением подстроки
+        if not search_term:
+            return queryset, False
+        return search(queryset, search_term, ENTITY_SEARCH_FIELDS, contains_fields=('creator__email',)), False
+
+    def get_inlines(self, request, obj):
+        # Большой каталог не выводится в форме целиком, вместо него показывается ссылка на список продуктов
+        if obj is not None and obj.products.count() > settings.ADMIN_INLINE_PRODUCTS_LIMIT:
+            return []
+        return super().get_inlines(request, obj)
+
+    # Ссылка на список продуктов объекта в разделе продуктов
+    def products_link(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:products_product_changelist')
+        return format_html('<a href="{}?network_entity__id__exact={}">Продукты объекта</a>', url, obj.pk)
+
+    products_link.short_description = 'Продукты'
 
     # Метод для отображения поставщика как ссылки
     def supplier_link(self, obj):
@@ -34,3 +75,26 @@ class NetworkEntityAdmin(admin.ModelAdmin):
         return "Нет поставщика"
 
     supplier_link.short_description = 'Поставщик'
+
+
+@admin.register(AdminJob)
+class AdminJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'action', 'status', 'progress', 'affected', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'action')
+    readonly_fields = ('action', 'model_label', 'status', 'progress', 'total', 'processed', 'affected', 'error',
+                       'created_by', 'created_at', 'started_at', 'finished_at')
+    exclude = ('pk_ranges',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    # Прогресс выполнения задачи в процентах
+    def progress(self, obj):
+        if not obj.total:
+            return '100%'
+        return f'{obj.processed}/{obj.total} ({obj.processed * 100 // obj.total}%)'
+
+    progress.short_description = 'Прогресс'
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from .apps import NetworkConfig
+from .async_views import AsyncNetworkEntityDetailView, AsyncNetworkEntityListView
+
+
+app_name = f'{NetworkConfig.name}_async'
+
+urlpatterns = [
+    path('network/', AsyncNetworkEntityListView.as_view(), name='networkentity-list'),
+    path('network/<int:pk>/', AsyncNetworkEntityDetailView.as_view(), name='networkentity-detail'),
+]
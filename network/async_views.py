@@ -0,0 +1,138 @@
+"""
+Асинхронные представления чтения для ASGI-развертывания.
+
+Запросы к БД выполняются асинхронным ORM, разрешения проверяются асинхронными методами
+`ahas_permission`, а ответ собирается тем же RowBuilder, что и быстрый путь синхронных списков,
+поэтому формат ответа, фильтры, `?fields=` и курсоры совпадают с синхронными эндпоинтами.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .fastpath import RowBuilder
+from .fieldsets import SparseFieldsetMixin
+from .filters import NetworkEntityFilter
+from .models import NetworkEntity
+from .paginators import AsyncNetworkEntityCursorPagination
+from .permissions import IsActiveUser
+from .renderers import FastJSONRenderer
+from .serializers import NetworkEntitySerializer
+
+
+class AsyncReadView(View):
+    """
+    Базовое асинхронное представление чтения с аутентификацией и разрешениями DRF.
+    Аутентификаторы DRF синхронные, поэтому вызываются через sync_to_async; в режиме JWT_STATELESS_AUTH
+    пользователь собирается из токена без запроса к БД.
+    """
+    queryset = None
+    serializer_class = None
+    filterset_class = None
+    pagination_class = None
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = [IsActiveUser]
+    lookup_field = 'pk'
+    lookup_url_kwarg = None
+    renderer = FastJSONRenderer()
+
+    async def get(self, request, *args, **kwargs):
+        self.request = Request(request, authenticators=())
+        self.format_kwarg = None
+        try:
+            self.request.user = await self.authenticate(request)
+            await self.check_permissions()
+            data = await self.get_data()
+        except exceptions.APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return self.render(detail, exc.status_code)
+        return self.render(data)
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), content_type='application/json', status=status_code)
+
+    async def authenticate(self, request):
+        for authentication_class in self.authentication_classes:
+            result = await sync_to_async(authentication_class().authenticate)(request)
+            if result is not None:
+                return result[0]
+        return AnonymousUser()
+
+    async def check_permissions(self):
+        for permission in [permission_class() for permission_class in self.permission_classes]:
+            if hasattr(permission, 'ahas_permission'):
+                allowed = await permission.ahas_permission(self.request, self)
+            else:
+                allowed = await sync_to_async(permission.has_permission)(self.request, self)
+            if not allowed:
+                if not self.request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get_serializer_class(self):
+        return self.serializer_class
+
+    def get_serializer_context(self):
+        return {'request': self.request, 'view': self}
+
+    def get_serializer(self):
+        return self.get_serializer_class()(context=self.get_serializer_context())
+
+    def filter_queryset(self, queryset):
+        if self.filterset_class is None:
+            return queryset
+        filterset = self.filterset_class(self.request.query_params, queryset, request=self.request)
+        if not filterset.is_valid():
+            raise exceptions.ValidationError(filterset.errors)
+        return filterset.qs
+
+
+class AsyncListView(SparseFieldsetMixin, AsyncReadView):
+    """Асинхронный список с курсорной пагинацией."""
+
+    async def get_data(self):
+        builder = RowBuilder(self.get_serializer())
+        paginator = self.pagination_class()
+        columns = builder.columns | {field.lstrip('-') for field in paginator.ordering}
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(*columns)
+        page = await paginator.apaginate_queryset(queryset, self.request, view=self)
+        return paginator.get_paginated_response(await builder.abuild(page)).data
+
+
+class AsyncDetailView(SparseFieldsetMixin, AsyncReadView):
+    """Асинхронная детальная информация об объекте."""
+
+    async def get_data(self):
+        builder = RowBuilder(self.get_serializer())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        row = await queryset.values(*builder.columns).afirst()
+        if row is None:
+            raise exceptions.NotFound()
+        return (await builder.abuild([row]))[0]
+
+
+class AsyncNetworkEntityListView(AsyncListView):
+    """
+    Асинхронное API-представление списка участников сети с фильтрами и курсорной пагинацией.
+    """
+    queryset = NetworkEntity.objects.all()
+    serializer_class = NetworkEntitySerializer
+    filterset_class = NetworkEntityFilter
+    pagination_class = AsyncNetworkEntityCursorPagination
+
+
+class AsyncNetworkEntityDetailView(AsyncDetailView):
+    """
+    Асинхронное API-представление детальной информации участника сети.
+    """
+    queryset = NetworkEntity.objects.all()
+    serializer_class = NetworkEntitySerializer
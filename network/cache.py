@@ -0,0 +1,173 @@
+"""
+Кеш готовых ответов эндпоинтов чтения.
+
+Ответ хранится в кеше RESPONSE_CACHE_ALIAS (общем для воркеров бэкенде, LocMemCache - только для разработки),
+ключ строится из адреса запроса с фильтрами, формата ответа и версий данных, от которых зависит ответ.
+Версии хранятся в том же кеше и увеличиваются сигналами post_save/post_delete и массовыми операциями:
+изменение объекта делает недействительными его детальную страницу и списки модели,
+массовый UPDATE - все страницы модели. Старые записи не удаляются, а вытесняются по LRU/TTL.
+"""
+import hashlib
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from monitoring.metrics import RESPONSE_CACHE_REQUESTS, registry
+
+
+CACHEABLE_FORMATS = ('json',)
+_invalidation_suspended = ContextVar('response_cache_invalidation_suspended', default=False)
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def list_version_key(label):
+    return f'response-cache:version:{label}:list'
+
+
+def bulk_version_key(label):
+    return f'response-cache:version:{label}:bulk'
+
+
+def object_version_key(label, pk):
+    return f'response-cache:version:{label}:{pk}'
+
+
+def get_versions(keys):
+    """
+    Возвращает версии по ключам. Отсутствующая (в том числе вытесненная) версия создается заново
+    из текущего времени, чтобы ответы, сохраненные со старой версией, больше не совпадали.
+    """
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+@contextmanager
+def suspend_invalidation():
+    """
+    Отключает сброс версий для изменений, которые будут откачены (пробный perform_update в explain_audit):
+    откат транзакции не возвращает версии, и закешированные ответы с ETag сбрасывались бы зря.
+    """
+    token = _invalidation_suspended.set(True)
+    try:
+        yield
+    finally:
+        _invalidation_suspended.reset(token)
+
+
+def bump(keys):
+    """
+    Увеличивает версии сразу и повторно после фиксации транзакции: иначе ответ, прочитанный
+    до фиксации, мог бы сохраниться под уже новой версией.
+    """
+    if _invalidation_suspended.get():
+        return
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def _bump(keys):
+    cache = get_cache()
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_objects(label, pks):
+    """Делает недействительными ответы с указанными объектами модели и ее списки."""
+    pks = {pk for pk in pks if pk is not None}
+    bump([list_version_key(label)] + [object_version_key(label, pk) for pk in pks])
+
+
+def invalidate_bulk(label):
+    """Делает недействительными все ответы модели после массового изменения строк без сигналов."""
+    bump([list_version_key(label), bulk_version_key(label)])
+
+
+def record(hit):
+    # Счетчики ведутся в памяти процесса: запись в общий кеш на каждое чтение стоила бы лишнего
+    # обращения к бэкенду, а incr DatabaseCache теряет обновления при конкурентной записи
+    registry.observe(RESPONSE_CACHE_REQUESTS, ('hit' if hit else 'miss',), 1)
+
+
+def cache_stats():
+    """Счетчики попаданий и промахов кеша ответов в текущем процессе."""
+    totals = registry.collect()
+    hits, misses = (totals.get((RESPONSE_CACHE_REQUESTS.name, (result,)), [0])[0] for result in ('hit', 'miss'))
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else 0.0}
+
+
+class CachedResponseMixin:
+    """
+    Кеширует отрендеренные ответы GET. Аутентификация и проверка разрешений выполняются до обращения
+    к кешу, поэтому в ключ входит пользователь только при `cache_vary_on_user = True`.
+    Сохраненные ETag/Last-Modified позволяют отвечать 304 без запросов к БД.
+    """
+    cache_label = None
+    cache_vary_on_user = False
+
+    def get_cache_dependencies(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            pk = self.kwargs[lookup_url_kwarg]
+            return [bulk_version_key(self.cache_label), object_version_key(self.cache_label, pk)]
+        return [list_version_key(self.cache_label)]
+
+    def get_cache_key(self, request):
+        parts = [request.build_absolute_uri(), request.accepted_renderer.format]
+        if self.cache_vary_on_user:
+            parts.append(str(request.user.pk))
+        parts.extend(str(version) for version in get_versions(self.get_cache_dependencies()))
+        digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+        return f'response-cache:{self.cache_label}:{digest}'
+
+    def get(self, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED or request.accepted_renderer.format not in CACHEABLE_FORMATS:
+            return super().get(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        cached = cache.get(key)
+        record(cached is not None)
+        if cached is not None:
+            return self.cached_response(request, cached)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(lambda rendered: cache.set(key, {
+                'content': rendered.content,
+                'content_type': rendered['Content-Type'],
+                'headers': {name: rendered[name] for name in ('ETag', 'Last-Modified') if rendered.has_header(name)},
+            }))
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def cached_response(self, request, cached):
+        headers = cached['headers']
+        response = None
+        if headers:
+            last_modified = parse_http_date_safe(headers.get('Last-Modified', ''))
+            response = get_conditional_response(request, etag=headers.get('ETag'), last_modified=last_modified)
+        if response is None:
+            response = HttpResponse(cached['content'], content_type=cached['content_type'])
+        for name, value in headers.items():
+            response[name] = value
+        response['X-Cache'] = 'HIT'
+        return response
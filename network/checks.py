@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_response_cache_backend(app_configs, **kwargs):
+    """
+    Версии данных кеша ответов (и ETag списков) должны быть общими для всех процессов-воркеров:
+    в кеше процесса запись сбрасывает только воркер, который ее обработал, остальные отдают устаревшие
+    ответы и ETag. Проверка выполняется `manage.py check --deploy`.
+    """
+    backend = settings.CACHES[settings.RESPONSE_CACHE_ALIAS]['BACKEND']
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f'Кеш ответов использует {backend}, его версии не видны другим процессам.',
+        hint='Задайте общий бэкенд в RESPONSE_CACHE_BACKEND: django.core.cache.backends.redis.RedisCache '
+             'или django.core.cache.backends.db.DatabaseCache (таблица создается manage.py createcachetable).',
+        id='network.E001',
+    )]
@@ -0,0 +1,42 @@
+import csv
+import io
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+NETWORK_EXPORT_FIELDS = [
+    'id', 'external_id', 'name', 'email', 'country', 'city', 'street', 'building_number',
+    'supplier_id', 'supplier_type', 'level', 'debt', 'created_at', 'creator_id',
+]
+PRODUCT_EXPORT_FIELDS = ['id', 'network_entity_id', 'name', 'model', 'description', 'release_date', 'creator_id']
+
+
+def iter_export(queryset, fields, export_format, chunk_size=2000):
+    """
+    Построчно выгружает queryset в NDJSON или CSV.
+    Строки читаются серверным курсором через iterator(chunk_size=...) и отдаются блоками,
+    поэтому потребление памяти не зависит от размера таблицы.
+    """
+    rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=chunk_size)
+    buffer = io.StringIO()
+
+    if export_format == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+
+        def write(row):
+            writer.writerow([value.isoformat() if hasattr(value, 'isoformat') else value for value in row])
+    else:
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+        def write(row):
+            buffer.write(encoder.encode(dict(zip(fields, row))))
+            buffer.write('\n')
+
+    for number, row in enumerate(rows, start=1):
+        write(row)
+        if number % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,126 @@
+"""
+Быстрый путь списков только для чтения: строки читаются через `.values()` и собираются в словари
+без создания экземпляров моделей и сериализаторов.
+
+Описание полей берется из сериализатора представления (с учетом `?fields=`), поэтому ответ совпадает
+с обычным путем: значения, которые DRF не меняет (строки, целые, выбор), копируются как есть,
+для остальных вызывается `to_representation` того же поля. Если в сериализаторе есть поле, которое
+нельзя прочитать из колонки, представление использует обычный путь.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+                      serializers.ChoiceField)
+
+
+class RowBuilder:
+    """Собирает ответ сериализатора из словарей `.values()`."""
+
+    def __init__(self, serializer):
+        self.model = serializer.Meta.model
+        self.pk_column = self.model._meta.pk.attname
+        self.fields = []  # (имя, колонка, преобразование или None) в порядке полей сериализатора
+        self.nested = {}  # имя -> (связь, RowBuilder дочернего сериализатора)
+        self.supported = True
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if '.' in field.source or field.source == '*':
+                self.supported = False
+            elif isinstance(field, serializers.ListSerializer):
+                relation = self.model._meta.get_field(field.source)
+                child = RowBuilder(field.child)
+                self.supported &= child.supported and relation.one_to_many
+                self.nested[name] = (relation, child)
+                self.fields.append((name, None, None))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                self.fields.append((name, self.model._meta.get_field(field.source).attname, None))
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                self.fields.append((name, field.source, None))
+            else:
+                self.fields.append((name, field.source, field.to_representation))
+
+    @property
+    def columns(self):
+        columns = {column for _, column, _ in self.fields if column is not None}
+        if self.nested:
+            columns.add(self.pk_column)
+        return columns
+
+    def build(self, rows):
+        rows = list(rows)
+        nested = {name: self.load_nested(relation, child, rows) for name, (relation, child) in self.nested.items()}
+        return self.assemble(rows, nested)
+
+    async def abuild(self, rows):
+        """Асинхронная версия build: связанные строки читаются асинхронным ORM."""
+        nested = {}
+        for name, (relation, child) in self.nested.items():
+            nested[name] = await self.aload_nested(relation, child, rows)
+        return self.assemble(rows, nested)
+
+    def assemble(self, rows, nested):
+        result = []
+        for row in rows:
+            item = {}
+            for name, column, convert in self.fields:
+                if column is None:
+                    item[name] = nested[name].get(row[self.pk_column], [])
+                    continue
+                value = row[column]
+                item[name] = convert(value) if convert is not None and value is not None else value
+            result.append(item)
+        return result
+
+    def load_nested(self, relation, child, rows):
+        """Подгружает связанные строки одним запросом на страницу, как prefetch_related."""
+        queryset = self.nested_queryset(relation, child, rows)
+        return self.group_nested(relation, child, list(queryset) if queryset is not None else [])
+
+    async def aload_nested(self, relation, child, rows):
+        queryset = self.nested_queryset(relation, child, rows)
+        return self.group_nested(relation, child, [row async for row in queryset] if queryset is not None else [])
+
+    def nested_queryset(self, relation, child, rows):
+        ids = [row[self.pk_column] for row in rows]
+        if not ids:
+            return None
+        fk_column = relation.field.attname
+        return relation.related_model._default_manager.filter(**{f'{fk_column}__in': ids}).values(
+            *(child.columns | {fk_column})
+        )
+
+    def group_nested(self, relation, child, related):
+        grouped = defaultdict(list)
+        for row, item in zip(related, child.build(related)):
+            grouped[row[relation.field.attname]].append(item)
+        return grouped
+
+
+class FastListMixin:
+    """
+    Отдает список через RowBuilder вместо сериализатора. Отключается настройкой FAST_LIST_ENDPOINTS.
+    Колонки сортировки пагинатора читаются дополнительно, чтобы строить курсоры по словарям.
+    """
+    def list(self, request, *args, **kwargs):
+        builder = RowBuilder(self.get_serializer())
+        if not settings.FAST_LIST_ENDPOINTS or not builder.supported:
+            return super().list(request, *args, **kwargs)
+
+        columns = builder.columns
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        columns |= {field.lstrip('-') for field in ordering}
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(*columns)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(builder.build(queryset))
+        return self.get_paginated_response(builder.build(page))
@@ -0,0 +1,80 @@
+"""
+Выборочные поля ответа: `?fields=id,name,debt` и `?expand=products`.
+
+Без параметров ответ не меняется. С `fields` сериализуются только перечисленные поля,
+вложенные связи (`Meta.expandable_fields`) добавляются через `fields` или `expand`.
+Неуказанные колонки исключаются из SQL через `only()`, а невыбранные связи не подгружаются.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+
+
+def parse_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+
+class SparseFieldsetSerializerMixin:
+    """Оставляет в сериализаторе только поля из `context['fields']`, если они заданы."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = kwargs.get('context', {}).get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """
+    Разбирает параметры `fields` и `expand` представления чтения, передает выбранные поля сериализатору
+    и сокращает queryset: `only()` по выбранным колонкам и prefetch только раскрытых связей.
+    """
+    def get_fieldset(self):
+        """Возвращает множество выбранных полей или None, если выбор не задан."""
+        if hasattr(self, '_fieldset'):
+            return self._fieldset
+
+        serializer_class = self.get_serializer_class()
+        available = set(serializer_class().fields)
+        expandable = getattr(serializer_class.Meta, 'expandable_fields', {})
+        fields = parse_list(self.request.query_params.get('fields'))
+        expand = parse_list(self.request.query_params.get('expand'))
+
+        unknown = set(fields) - available
+        if unknown:
+            raise ValidationError({'fields': f"Неизвестные поля: {', '.join(sorted(unknown))}."})
+        unknown = set(expand) - set(expandable)
+        if unknown:
+            raise ValidationError({'expand': f"Нельзя раскрыть: {', '.join(sorted(unknown))}."})
+
+        self._fieldset = set(fields) | set(expand) if fields else None
+        return self._fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_fieldset()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return queryset
+
+        serializer_fields = self.get_serializer_class()().fields
+        expandable = getattr(self.get_serializer_class().Meta, 'expandable_fields', {})
+        columns = {'pk'}
+        for name in fieldset - set(expandable):
+            try:
+                model_field = queryset.model._meta.get_field(serializer_fields[name].source)
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete:
+                columns.add(model_field.name)
+        # Курсор пагинации строится по полям сортировки, без них каждый объект страницы дочитывался бы запросом
+        ordering = getattr(getattr(self, 'paginator', None), 'ordering', None) or ()
+        columns.update(field.lstrip('-') for field in ((ordering,) if isinstance(ordering, str) else ordering))
+
+        queryset = queryset.prefetch_related(None).only(*columns)
+        lookups = [lookup for name, lookup in expandable.items() if name in fieldset]
+        return queryset.prefetch_related(*lookups) if lookups else queryset
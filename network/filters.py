@@ -0,0 +1,21 @@
+import django_filters
+
+from .models import NetworkEntity
+
+
+class NetworkEntityFilter(django_filters.FilterSet):
+    """
+    Фильтры списка участников сети. Каждому фильтру соответствует индекс,
+    заканчивающийся колонками пагинации (created_at, id).
+    Поставщик и создатель фильтруются по id без проверочного запроса к связанной таблице.
+    """
+    supplier = django_filters.NumberFilter(field_name='supplier_id')
+    creator = django_filters.NumberFilter(field_name='creator_id')
+    debt_min = django_filters.NumberFilter(field_name='debt', lookup_expr='gte')
+    debt_max = django_filters.NumberFilter(field_name='debt', lookup_expr='lte')
+    created_after = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lte')
+
+    class Meta:
+        model = NetworkEntity
+        fields = ['country', 'city', 'supplier_type', 'level']
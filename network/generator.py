@@ -0,0 +1,156 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from products.models import Product
+from .cache import invalidate_bulk, invalidate_objects
+from .models import NetworkEntity
+from .rollups import apply_subtree_deltas, apply_summary_deltas, path_ids
+
+
+COUNTRIES = ('Россия', 'Казахстан', 'Беларусь', 'Армения', 'Узбекистан', 'Киргизия')
+CITIES = ('Москва', 'Санкт-Петербург', 'Казань', 'Новосибирск', 'Алматы', 'Астана', 'Минск', 'Ереван',
+          'Ташкент', 'Бишкек')
+STREETS = ('Ленина', 'Мира', 'Садовая', 'Центральная', 'Заводская', 'Молодежная', 'Школьная')
+PRODUCT_KINDS = ('Смартфон', 'Ноутбук', 'Планшет', 'Телевизор', 'Наушники', 'Монитор', 'Роутер')
+ENTITY_NAMES = {0: 'Завод', 1: 'Розничная сеть', 2: 'ИП'}
+
+
+class NetworkGenerator:
+    """
+    Генератор синтетической сети для нагрузочных тестов и профилирования.
+
+    Сеть строится деревьями: завод (уровень 0) и его клиенты - розничные сети и ИП - до глубины `depth`,
+    у каждого поставщика в среднем `branching` клиентов. Деревья добавляются, пока не будет создано
+    `entities` объектов. Первичные ключи выдаются заранее, поэтому уровень и материализованный путь
+    известны до вставки и строки пишутся только через bulk_create пачками, без NetworkEntity.save().
+    Ассортимент клиента - случайная часть ассортимента его поставщика, как требует ProductSerializer.
+    Деревья обходятся в глубину, в памяти держится только текущая ветка и неотправленная пачка.
+    Агрегаты задолженности обновляются приращениями после каждой пачки, как при импорте.
+    """
+
+    def __init__(self, creator_ids, depth=3, branching=4, products=20, inherit_ratio=0.6, max_debt=100000,
+                 batch_size=5000, seed=None):
+        self.creator_ids = list(creator_ids)
+        self.depth = depth
+        self.branching = branching
+        self.products = products
+        self.inherit_ratio = inherit_ratio
+        self.max_debt = max_debt
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.created_entities = 0
+        self.created_products = 0
+        self._entities = []
+        self._products = []
+        self._next_pk = None
+
+    def run(self, entities):
+        self._next_pk = (NetworkEntity.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        limit = self.created_entities + entities
+        while self.created_entities + len(self._entities) < limit:
+            self._tree(limit)
+        self._flush()
+        self._reset_sequence()
+        invalidate_bulk(NetworkEntity._meta.label_lower)
+        invalidate_objects(Product._meta.label_lower, [])
+        return {'entities': self.created_entities, 'products': self.created_products}
+
+    def _tree(self, limit):
+        country = self.rng.choice(COUNTRIES)
+        factory = self._entity(None, 0, country)
+        catalog = [
+            (f'{self.rng.choice(PRODUCT_KINDS)} {factory.pk}-{number}', f'M{number}',
+             datetime.date(2015, 1, 1) + datetime.timedelta(days=self.rng.randint(0, 3650)))
+            for number in range(1, self.products + 1)
+        ]
+        self._catalog(factory, catalog)
+
+        stack = [(factory, catalog)]
+        while stack:
+            supplier, catalog = stack.pop()
+            if supplier.level >= self.depth:
+                continue
+            for _ in range(self.rng.randint(max(1, self.branching // 2), self.branching + self.branching // 2)):
+                if self.created_entities + len(self._entities) >= limit:
+                    return
+                client = self._entity(supplier, self.rng.choice((1, 2)), country)
+                inherited = self.rng.sample(catalog, round(len(catalog) * self.inherit_ratio))
+                self._catalog(client, inherited)
+                stack.append((client, inherited))
+
+    def _entity(self, supplier, supplier_type, country):
+        pk = self._next_pk
+        self._next_pk += 1
+        entity = NetworkEntity(
+            pk=pk,
+            creator_id=self.rng.choice(self.creator_ids),
+            name=f'{ENTITY_NAMES[supplier_type]} {pk}',
+            email=f'entity{pk}@example.com',
+            country=country,
+            city=self.rng.choice(CITIES),
+            street=self.rng.choice(STREETS),
+            building_number=str(self.rng.randint(1, 200)),
+            supplier_id=supplier.pk if supplier else None,
+            supplier_type=supplier_type,
+            debt=Decimal(self.rng.randint(0, self.max_debt * 100)) / 100 if supplier else Decimal(0),
+            level=supplier.level + 1 if supplier else 0,
+            path=f"{supplier.path if supplier else '/'}{pk}/",
+        )
+        self._entities.append(entity)
+        if len(self._entities) >= self.batch_size:
+            self._flush()
+        return entity
+
+    def _catalog(self, entity, catalog):
+        self._products.extend(
+            Product(creator_id=entity.creator_id, network_entity_id=entity.pk, name=name, model=model,
+                    release_date=release_date)
+            for name, model, release_date in catalog
+        )
+        if len(self._products) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        """Сохраняет накопленные пачки: объекты сети раньше продуктов, которые на них ссылаются."""
+        with transaction.atomic():
+            outside = self._fold_subtree_debt()
+            NetworkEntity.objects.bulk_create(self._entities, batch_size=self.batch_size)
+            Product.objects.bulk_create(self._products, batch_size=self.batch_size)
+            apply_subtree_deltas(outside)
+            apply_summary_deltas((entity.country, entity.level, entity.debt, 1) for entity in self._entities)
+        self.created_entities += len(self._entities)
+        self.created_products += len(self._products)
+        self._entities = []
+        self._products = []
+
+    def _fold_subtree_debt(self):
+        """
+        Заполняет subtree_debt объектов пачки до вставки и возвращает приращения для предков
+        из предыдущих пачек. Ключи выдаются в порядке обхода, поэтому такие предки - начало пути.
+        """
+        batch = {entity.pk: entity for entity in self._entities}
+        first_pk = self._entities[0].pk if self._entities else None
+        outside = []
+        for entity in self._entities:
+            ids = path_ids(entity.path)
+            for pk in ids:
+                if pk >= first_pk:
+                    batch[pk].subtree_debt += entity.debt
+            ancestors = [pk for pk in ids if pk < first_pk]
+            if ancestors and entity.debt:
+                outside.append((''.join(f'/{pk}' for pk in ancestors) + '/', entity.debt))
+        return outside
+
+    @staticmethod
+    def _reset_sequence():
+        """Сдвигает последовательность первичных ключей за выданные вручную значения."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [NetworkEntity])
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
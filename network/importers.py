@@ -0,0 +1,181 @@
+import csv
+import io
+import json
+from collections import OrderedDict, defaultdict
+
+from django.db import transaction
+
+from .cache import invalidate_objects
+from .models import NetworkEntity
+from .rollups import apply_subtree_deltas, apply_summary_deltas
+from .serializers import NetworkEntityImportSerializer
+
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_format(filename):
+    """Определяет формат файла импорта по расширению."""
+    extension = filename.rsplit('.', 1)[-1].lower()
+    return 'jsonl' if extension in ('jsonl', 'ndjson', 'json') else 'csv'
+
+
+def read_rows(stream, file_format):
+    """
+    Построчно читает текстовый поток CSV или JSONL и возвращает пары (номер строки, данные).
+    Пустые значения CSV отбрасываются, чтобы к полю применялось значение по умолчанию.
+    """
+    if file_format == 'csv':
+        for line_number, row in enumerate(csv.DictReader(stream), start=2):
+            yield line_number, {key: value for key, value in row.items() if key and value not in ('', None)}
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+
+def open_text(binary_stream):
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+
+
+class NetworkImporter:
+    """
+    Потоковый импорт объектов сети со ссылками на поставщиков по внешнему ключу.
+
+    Строки накапливаются пачками. В каждой пачке поставщики разрешаются одним запросом,
+    а строки вставляются волнами в топологическом порядке: сначала те, чей поставщик уже сохранен,
+    затем их клиенты. Уровень и путь вычисляются в памяти, каждая пачка сохраняется в отдельной транзакции.
+    Память ограничена размером пачки, LRU-кешем сохраненных поставщиков и строками, чей поставщик
+    встретится в файле позже.
+    """
+
+    def __init__(self, creator_id, batch_size=1000, cache_size=100000):
+        self.creator_id = creator_id
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self._pending = []
+        self._waiting = defaultdict(list)  # внешний ключ поставщика -> строки, ожидающие его появления
+        self._waiting_keys = set()
+        self._saved = OrderedDict()  # внешний ключ -> (pk, уровень, путь)
+
+    def run(self, rows):
+        for line_number, data in rows:
+            self.add(line_number, data)
+        self.finish()
+        return self.report()
+
+    def add(self, line_number, data):
+        serializer = NetworkEntityImportSerializer(data=data)
+        if data is None:
+            self._error(line_number, 'Некорректная строка.')
+        elif not serializer.is_valid():
+            self._error(line_number, serializer.errors)
+        else:
+            self._pending.append((line_number, serializer.validated_data))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def finish(self):
+        self.flush()
+        for rows in self._waiting.values():
+            for line_number, data in rows:
+                self._error(line_number, f"Поставщик '{data['supplier']}' не найден.")
+        self._waiting.clear()
+        self._waiting_keys.clear()
+
+    def report(self):
+        return {'created': self.created, 'error_count': self.error_count, 'errors': self.errors}
+
+    def flush(self):
+        rows, self._pending = self._pending, []
+        if not rows:
+            return
+
+        keys = {data['external_id'] for _, data in rows}
+        existing = set(NetworkEntity.objects.filter(external_id__in=keys).values_list('external_id', flat=True))
+        unique_rows = []
+        for line_number, data in rows:
+            if data['external_id'] in existing or data['external_id'] in self._waiting_keys:
+                self._error(line_number, f"Объект с внешним ключом '{data['external_id']}' уже существует.")
+            else:
+                existing.add(data['external_id'])
+                unique_rows.append((line_number, data))
+
+        # Поставщики из строк этой пачки появятся при вставке, остальные (в том числе отклоненные
+        # как уже существующие) ищутся в БД
+        self._resolve_suppliers({
+            data.get('supplier') for _, data in unique_rows
+            if data['supplier_type'] != 0 and data.get('supplier')
+        } - {data['external_id'] for _, data in unique_rows})
+
+        with transaction.atomic():
+            wave = []
+            for line_number, data in unique_rows:
+                supplier_key = data.get('supplier') if data['supplier_type'] != 0 else None
+                if not supplier_key:
+                    wave.append((line_number, data, None))
+                elif supplier_key in self._saved:
+                    wave.append((line_number, data, self._saved[supplier_key]))
+                else:
+                    self._waiting[supplier_key].append((line_number, data))
+                    self._waiting_keys.add(data['external_id'])
+            while wave:
+                wave = self._insert(wave)
+
+    def _resolve_suppliers(self, keys):
+        missing = [key for key in keys if key not in self._saved]
+        for key, pk, level, path in NetworkEntity.objects.filter(external_id__in=missing).values_list(
+                'external_id', 'pk', 'level', 'path'):
+            self._remember(key, (pk, level, path))
+
+    def _insert(self, wave):
+        """
+        Вставляет строки с известными поставщиками и возвращает следующую волну:
+        клиентов, ожидавших только что сохраненные объекты.
+        """
+        entities = []
+        for _, data, supplier in wave:
+            fields = {key: value for key, value in data.items() if key != 'supplier'}
+            if fields['supplier_type'] == 0:
+                level = 0
+            else:
+                level = supplier[1] + 1 if supplier else 1
+            entities.append(NetworkEntity(
+                creator_id=self.creator_id, supplier_id=supplier[0] if supplier else None, level=level, **fields
+            ))
+        NetworkEntity.objects.bulk_create(entities, batch_size=self.batch_size)
+
+        next_wave = []
+        for (_, _, supplier), entity in zip(wave, entities):
+            entity.path = f"{supplier[2] if supplier else '/'}{entity.pk}/"
+            saved = (entity.pk, entity.level, entity.path)
+            self._remember(entity.external_id, saved)
+            for line_number, data in self._waiting.pop(entity.external_id, []):
+                self._waiting_keys.discard(data['external_id'])
+                next_wave.append((line_number, data, saved))
+        NetworkEntity.objects.bulk_update(entities, ['path'], batch_size=self.batch_size)
+        apply_subtree_deltas((entity.path, entity.debt) for entity in entities)
+        apply_summary_deltas((entity.country, entity.level, entity.debt, 1) for entity in entities)
+        invalidate_objects(NetworkEntity._meta.label_lower, [])  # Новые строки меняют только списки
+        self.created += len(entities)
+        return next_wave
+
+    def _remember(self, key, value):
+        self._saved[key] = value
+        self._saved.move_to_end(key)
+        if len(self._saved) > self.cache_size:
+            self._saved.popitem(last=False)
+
+    def _error(self, line_number, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'errors': errors})
@@ -0,0 +1,149 @@
+"""
+Фоновое выполнение массовых действий админки пачками по выбранным первичным ключам.
+
+Действие регистрируется декоратором `register_job` и получает queryset одной пачки.
+Режим запуска задается настройкой ADMIN_JOBS_MODE:
+`thread` - в фоновом потоке веб-процесса, `worker` - отдельным процессом `manage.py run_admin_jobs`,
+`sync` - сразу в запросе (для тестов).
+"""
+import logging
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AdminJob
+from .rollups import clear_debt
+
+
+logger = logging.getLogger(__name__)
+JOB_HANDLERS = {}
+
+
+def register_job(name):
+    """Регистрирует обработчик пачки: функцию, принимающую queryset и возвращающую число измененных строк."""
+    def decorator(handler):
+        JOB_HANDLERS[name] = handler
+        return handler
+    return decorator
+
+
+def collect_pk_chunks(queryset, chunk_size):
+    """
+    Делит выбранные первичные ключи на пачки по chunk_size выбранных строк.
+    Пачка без пропусков хранится диапазоном [начало, конец], соседние такие пачки сливаются в один диапазон;
+    пачка с пропусками (выборка по фильтру) - как [начало, конец, [ключи]].
+    """
+    chunks = []
+    total = 0
+
+    def add(pks):
+        if pks[-1] - pks[0] + 1 != len(pks):
+            chunks.append([pks[0], pks[-1], pks])
+        elif chunks and len(chunks[-1]) == 2 and chunks[-1][1] == pks[0] - 1:
+            chunks[-1][1] = pks[-1]
+        else:
+            chunks.append([pks[0], pks[-1]])
+
+    pks = []
+    for pk in queryset.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=5000):
+        total += 1
+        pks.append(pk)
+        if len(pks) >= chunk_size:
+            add(pks)
+            pks = []
+    if pks:
+        add(pks)
+    return chunks, total
+
+
+def iter_chunks(pk_chunks, chunk_size):
+    """Пачки (начало, конец, ключи или None): диапазоны делятся на части не больше chunk_size ключей."""
+    for chunk in pk_chunks:
+        if len(chunk) == 3:
+            yield tuple(chunk)
+            continue
+        start, end = chunk
+        while start <= end:
+            yield start, min(start + chunk_size - 1, end), None
+            start += chunk_size
+
+
+def enqueue_job(action, queryset, user=None):
+    """Создает задачу для выбранных строк и запускает ее в соответствии с ADMIN_JOBS_MODE."""
+    if action not in JOB_HANDLERS:
+        raise ValueError(f'Неизвестное действие {action}.')
+    pk_ranges, total = collect_pk_chunks(queryset, settings.ADMIN_JOBS_CHUNK_SIZE)
+    job = AdminJob.objects.create(
+        action=action, model_label=queryset.model._meta.label_lower, pk_ranges=pk_ranges, total=total,
+        created_by=user if user is not None and user.pk else None,
+    )
+    mode = settings.ADMIN_JOBS_MODE
+    if mode == 'sync':
+        run_job(job.pk)
+    elif mode == 'thread':
+        transaction.on_commit(lambda: threading.Thread(target=_run_in_thread, args=(job.pk,), daemon=True).start())
+    return job
+
+
+def run_job(job_id):
+    """
+    Выполняет задачу, если ее удалось захватить: каждая пачка обрабатывается в своей транзакции,
+    после нее сохраняется прогресс.
+    """
+    claimed = AdminJob.objects.filter(pk=job_id, status=AdminJob.STATUS_QUEUED).update(
+        status=AdminJob.STATUS_RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    job = AdminJob.objects.get(pk=job_id)
+    model = apps.get_model(job.model_label)
+    handler = JOB_HANDLERS[job.action]
+    chunk_size = settings.ADMIN_JOBS_CHUNK_SIZE
+    try:
+        for start, end, pks in iter_chunks(job.pk_ranges, chunk_size):
+            with transaction.atomic():
+                chunk = model._default_manager.filter(pk__gte=start, pk__lte=end)
+                if pks is not None:
+                    chunk = chunk.filter(pk__in=pks)
+                affected = handler(chunk)
+                AdminJob.objects.filter(pk=job_id).update(
+                    processed=F('processed') + (end - start + 1 if pks is None else len(pks)),
+                    affected=F('affected') + affected,
+                )
+    except Exception as exc:
+        logger.exception('Фоновая задача %s завершилась с ошибкой', job_id)
+        AdminJob.objects.filter(pk=job_id).update(
+            status=AdminJob.STATUS_FAILED, error=str(exc), finished_at=timezone.now()
+        )
+        return True
+
+    AdminJob.objects.filter(pk=job_id).update(
+        status=AdminJob.STATUS_DONE, processed=job.total, finished_at=timezone.now()
+    )
+    return True
+
+
+def run_queued_jobs():
+    """Выполняет все задачи в очереди. Используется отдельным процессом-обработчиком."""
+    count = 0
+    for job_id in AdminJob.objects.filter(status=AdminJob.STATUS_QUEUED).order_by('pk').values_list('pk', flat=True):
+        count += run_job(job_id)
+    return count
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+@register_job('clear_supplier_debt')
+def clear_supplier_debt(queryset):
+    return clear_debt(queryset)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from network.exporters import EXPORT_FORMATS, NETWORK_EXPORT_FIELDS, PRODUCT_EXPORT_FIELDS, iter_export
+from network.models import NetworkEntity
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка объектов сети или продуктов в NDJSON или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--what', choices=('network', 'products'), default='network')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson')
+        parser.add_argument('--output', help='Путь к файлу, по умолчанию stdout')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['what'] == 'network':
+            queryset, fields = NetworkEntity.objects.all(), NETWORK_EXPORT_FIELDS
+        else:
+            queryset, fields = Product.objects.all(), PRODUCT_EXPORT_FIELDS
+
+        chunks = iter_export(queryset, fields, options['format'], chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as stream:
+                stream.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
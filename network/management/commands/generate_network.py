@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from network.generator import NetworkGenerator
+
+
+class Command(BaseCommand):
+    help = 'Генерирует синтетическую сеть поставщиков с ассортиментом для нагрузочных тестов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entities', type=int, required=True, help='Число создаваемых объектов сети')
+        parser.add_argument('--depth', type=int, default=3, help='Глубина иерархии под заводами')
+        parser.add_argument('--branching', type=int, default=4, help='Среднее число клиентов у поставщика')
+        parser.add_argument('--products', type=int, default=20, help='Размер ассортимента завода')
+        parser.add_argument('--inherit-ratio', type=float, default=0.6,
+                            help='Доля ассортимента поставщика, которую получает клиент')
+        parser.add_argument('--max-debt', type=int, default=100000, help='Максимальная задолженность клиента')
+        parser.add_argument('--creators', type=int, default=10, help='Число пользователей-создателей')
+        parser.add_argument('--password', help='Пароль создателей, по умолчанию вход для них отключен')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, help='Зерно генератора для воспроизводимых данных')
+
+    def handle(self, *args, **options):
+        if options['entities'] < 1 or options['creators'] < 1:
+            raise CommandError('Число объектов сети и создателей должно быть положительным.')
+        if not 0 <= options['inherit_ratio'] <= 1:
+            raise CommandError('Доля наследуемого ассортимента должна быть от 0 до 1.')
+
+        generator = NetworkGenerator(
+            self.get_creator_ids(options['creators'], options['password']),
+            depth=options['depth'], branching=options['branching'], products=options['products'],
+            inherit_ratio=options['inherit_ratio'], max_debt=options['max_debt'],
+            batch_size=options['batch_size'], seed=options['seed'],
+        )
+        report = generator.run(options['entities'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано {report['entities']} объектов сети и {report['products']} продуктов."
+        ))
+
+    @staticmethod
+    def get_creator_ids(count, password):
+        """Создает недостающих пользователей generator-N@example.com одним запросом с общим хешем пароля."""
+        User = get_user_model()
+        emails = [f'generator-{number}@example.com' for number in range(1, count + 1)]
+        password_hash = make_password(password)
+        User.objects.bulk_create([User(email=email, password=password_hash) for email in emails],
+                                 ignore_conflicts=True)
+        return list(User.objects.filter(email__in=emails).values_list('pk', flat=True))
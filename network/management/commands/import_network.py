@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from network.importers import IMPORT_FORMATS, NetworkImporter, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Потоковый импорт объектов сети из файла CSV или JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу импорта')
+        parser.add_argument('--creator', required=True, help='Email пользователя, от имени которого создаются объекты')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Формат файла, по умолчанию по расширению')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        creator = get_user_model().objects.filter(email=options['creator']).first()
+        if creator is None:
+            raise CommandError(f"Пользователь {options['creator']} не найден.")
+
+        file_format = options['format'] or detect_format(options['path'])
+        importer = NetworkImporter(creator.pk, batch_size=options['batch_size'])
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            report = importer.run(read_rows(stream, file_format))
+
+        for error in report['errors']:
+            self.stderr.write(f"Строка {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано {report['created']} объектов сети, ошибок: {report['error_count']}."
+        ))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, CharField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+
+from network import rollups
+from network.cache import invalidate_bulk
+from network.models import NetworkEntity
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает уровни иерархии и материализованные пути всех объектов сети'
+
+    def handle(self, *args, **options):
+        """
+        Пересчет идет волнами по глубине дерева: сначала корни, затем за один UPDATE
+        все объекты, чей поставщик уже обработан. Число запросов равно глубине иерархии,
+        а не количеству строк. После пересчета перестраиваются агрегаты задолженности.
+        """
+        entities = NetworkEntity.objects.all()
+        own_segment = (Cast('pk', output_field=CharField()), Value('/'))
+        parent = NetworkEntity.objects.filter(pk=OuterRef('supplier_id'))
+        now = timezone.now()
+
+        with transaction.atomic():
+            roots = entities.filter(Q(supplier__isnull=True) | Q(supplier_type=0))
+            total = roots.update(
+                level=Case(When(supplier_type=0, then=Value(0)), default=Value(1)),
+                path=Concat(Value('/'), *own_segment),
+                updated_at=now,
+            )
+            entities.filter(supplier__isnull=False).exclude(supplier_type=0).update(path='')
+
+            depth = 0
+            while True:
+                updated = entities.filter(path='').exclude(supplier__path='').update(
+                    level=Subquery(parent.values('level')[:1]) + 1,
+                    path=Concat(Subquery(parent.values('path')[:1]), *own_segment),
+                    updated_at=now,
+                )
+                if not updated:
+                    break
+                total += updated
+                depth += 1
+
+            rollups.rebuild()
+            invalidate_bulk(NetworkEntity._meta.label_lower)
+
+        unresolved = entities.filter(path='').count()
+        if unresolved:
+            self.stderr.write(self.style.WARNING(
+                f'{unresolved} объектов не пересчитаны: их цепочка поставщиков замкнута в цикл.'
+            ))
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано {total} объектов сети, глубина иерархии {depth}.'))
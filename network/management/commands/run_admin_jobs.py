@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from network.jobs import run_queued_jobs
+
+
+class Command(BaseCommand):
+    help = 'Обработчик фоновых задач массовых действий админки (ADMIN_JOBS_MODE=worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Выполнить задачи в очереди и завершиться')
+        parser.add_argument('--interval', type=float, default=2.0, help='Интервал опроса очереди в секундах')
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_queued_jobs()
+            if count:
+                self.stdout.write(f'Выполнено задач: {count}')
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    """Заполняет материализованные пути существующих объектов обходом дерева от корней."""
+    NetworkEntity = apps.get_model('network', 'NetworkEntity')
+    children = {}
+    for pk, supplier_id in NetworkEntity.objects.values_list('pk', 'supplier_id').iterator():
+        children.setdefault(supplier_id, []).append(pk)
+
+    stack = [(pk, f'/{pk}/') for pk in children.get(None, [])]
+    batch = []
+    while stack:
+        pk, path = stack.pop()
+        batch.append(NetworkEntity(pk=pk, path=path))
+        stack.extend((child, f'{path}{child}/') for child in children.get(pk, []))
+        if len(batch) >= 1000:
+            NetworkEntity.objects.bulk_update(batch, ['path'])
+            batch = []
+    NetworkEntity.objects.bulk_update(batch, ['path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkentity',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=1024, verbose_name='путь в иерархии'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0003_networkentity_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='networkentity',
+            index=models.Index(fields=['created_at', 'id'], name='network_created_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0004_networkentity_created_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkentity',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='внешний ключ'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:44
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def fill_rollups(apps, schema_editor):
+    """Заполняет агрегаты задолженности для существующих объектов сети."""
+    NetworkEntity = apps.get_model('network', 'NetworkEntity')
+    DebtSummary = apps.get_model('network', 'DebtSummary')
+
+    subtree = defaultdict(Decimal)
+    summary = defaultdict(lambda: [Decimal(0), 0])
+    rows = NetworkEntity.objects.values_list('path', 'country', 'level', 'debt').iterator()
+    for path, country, level, debt in rows:
+        debt = debt or Decimal(0)
+        for pk in path.strip('/').split('/'):
+            if pk:
+                subtree[int(pk)] += debt
+        summary[(country, level)][0] += debt
+        summary[(country, level)][1] += 1
+
+    NetworkEntity.objects.bulk_update(
+        [NetworkEntity(pk=pk, subtree_debt=total) for pk, total in subtree.items() if total],
+        ['subtree_debt'], batch_size=1000,
+    )
+    DebtSummary.objects.bulk_create(
+        DebtSummary(country=country, level=level, total_debt=total, entity_count=count)
+        for (country, level), (total, count) in summary.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0005_networkentity_external_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkentity',
+            name='subtree_debt',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=18, verbose_name='задолженность поддерева'),
+        ),
+        migrations.CreateModel(
+            name='DebtSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country', models.CharField(max_length=100, verbose_name='страна')),
+                ('level', models.PositiveIntegerField(verbose_name='уровень иерархии')),
+                ('total_debt', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='сумма задолженности')),
+                ('entity_count', models.PositiveIntegerField(default=0, verbose_name='количество объектов')),
+            ],
+            options={
+                'verbose_name': 'Сводная задолженность',
+                'verbose_name_plural': 'Сводная задолженность',
+                'constraints': [models.UniqueConstraint(fields=('country', 'level'), name='network_debtsummary_country_level_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
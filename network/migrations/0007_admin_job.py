@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0006_debt_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(max_length=100, verbose_name='действие')),
+                ('model_label', models.CharField(max_length=100, verbose_name='модель')),
+                ('pk_ranges', models.JSONField(default=list, verbose_name='диапазоны первичных ключей')),
+                ('status', models.CharField(choices=[('queued', 'в очереди'), ('running', 'выполняется'), ('done', 'завершена'), ('failed', 'ошибка')], db_index=True, default='queued', max_length=10, verbose_name='статус')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='всего объектов')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='обработано')),
+                ('affected', models.PositiveIntegerField(default=0, verbose_name='изменено')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='время создания')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='время запуска')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='время завершения')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='создатель')),
+            ],
+            options={
+                'verbose_name': 'Фоновая задача',
+                'verbose_name_plural': 'Фоновые задачи',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
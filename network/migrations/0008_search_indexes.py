@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+INDEXES = {
+    'network_name_trgm_idx': 'name',
+    'network_city_trgm_idx': 'city',
+    'network_country_trgm_idx': 'country',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Создает триграммные GIN-индексы для поиска. На других СУБД поиск работает без индексов."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON network_networkentity USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0007_admin_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
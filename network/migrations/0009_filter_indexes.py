@@ -0,0 +1,43 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0008_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='networkentity',
+            index=models.Index(fields=['country', 'created_at', 'id'], name='network_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networkentity',
+            index=models.Index(fields=['city', 'created_at', 'id'], name='network_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networkentity',
+            index=models.Index(fields=['supplier_type', 'created_at', 'id'], name='network_supplier_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networkentity',
+            index=models.Index(fields=['level', 'created_at', 'id'], name='network_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networkentity',
+            index=models.Index(fields=['supplier', 'created_at', 'id'], name='network_supplier_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networkentity',
+            index=models.Index(fields=['creator', 'created_at', 'id'], name='network_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networkentity',
+            index=models.Index(fields=['debt'], name='network_debt_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0010_networkentity_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='adminjob',
+            name='pk_ranges',
+            field=models.JSONField(default=list, verbose_name='пачки первичных ключей'),
+        ),
+    ]
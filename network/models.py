@@ -1,10 +1,17 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from .cache import invalidate_bulk, invalidate_objects
+
 
 User = get_user_model()
 NULLABLE = {'blank': True, 'null': True}
+SUPPLIER_CYCLE_ERROR = 'Поставщик не может быть клиентом этого же объекта сети.'
 
 
 class NetworkEntity(models.Model):
@@ -27,27 +34,183 @@ class NetworkEntity(models.Model):
     debt = models.DecimalField(max_digits=12, decimal_places=2, default=0.00,
                                verbose_name='Задолженность перед поставщиком', **NULLABLE)
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Время создания')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name='Время изменения')
     supplier_type = models.IntegerField(choices=TYPE_CHOICES, default=0, verbose_name='тип поставщика')
     level = models.PositiveIntegerField(editable=False, verbose_name='уровень иерархии')
+    path = models.CharField(max_length=1024, editable=False, db_index=True, default='',
+                            verbose_name='путь в иерархии')
+    external_id = models.CharField(max_length=64, unique=True, verbose_name='внешний ключ', **NULLABLE)
+    subtree_debt = models.DecimalField(max_digits=18, decimal_places=2, default=0, editable=False,
+                                       verbose_name='задолженность поддерева')
 
     class Meta:
         verbose_name = 'Объект сети'
         verbose_name_plural = 'Объекты сети'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='network_created_at_id_idx'),
+            # Фильтры списка: равенство по колонке и затем порядок пагинации (created_at, id)
+            models.Index(fields=['country', 'created_at', 'id'], name='network_country_idx'),
+            models.Index(fields=['city', 'created_at', 'id'], name='network_city_idx'),
+            models.Index(fields=['supplier_type', 'created_at', 'id'], name='network_supplier_type_idx'),
+            models.Index(fields=['level', 'created_at', 'id'], name='network_level_idx'),
+            models.Index(fields=['supplier', 'created_at', 'id'], name='network_supplier_created_idx'),
+            models.Index(fields=['creator', 'created_at', 'id'], name='network_creator_created_idx'),
+            models.Index(fields=['debt'], name='network_debt_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def clean(self):
+        """Поставщиком нельзя выбрать сам объект или одного из его клиентов: иерархия стала бы циклом."""
+        super().clean()
+        if self.pk is not None and self.supplier_id is not None and self.supplier_type != 0:
+            if NetworkEntity.objects.filter(pk=self.supplier_id, path__contains=f'/{self.pk}/').exists():
+                raise ValidationError({'supplier': SUPPLIER_CYCLE_ERROR})
+
     def save(self, *args, **kwargs):
-        """При сохранении поставщиков автоматически определяется уровень иерархии"""
+        """
+        При сохранении поставщиков автоматически определяется уровень иерархии
+        и материализованный путь (`/id_завода/.../id_объекта/`).
+        Если у объекта сменился поставщик или уровень, пути и уровни всего его поддерева
+        пересчитываются одним UPDATE внутри той же транзакции.
+        """
         if self.supplier_type == 0:
             self.supplier = None  # У завода не должно быть поставщика
-            self.level = 0
-        elif self.supplier:  # Устанавливаем на один уровень ниже уровня поставщика
-            self.level = self.supplier.level + 1
-        else:
-            self.level = 1  # Указываем уровень по умолчанию для новых объектов, если поставщик не задан
 
-        super().save(*args, **kwargs)
+        from .rollups import entity_saved, shift_subtree_levels
+
+        with transaction.atomic():
+            # Актуальные путь, уровень и агрегаты берем из БД: экземпляры в памяти могут быть устаревшими
+            known = {
+                row['pk']: row for row in NetworkEntity.objects.select_for_update().filter(
+                    pk__in=[pk for pk in (self.pk, self.supplier_id) if pk is not None]
+                ).values('pk', 'path', 'level', 'debt', 'country', 'subtree_debt')
+            }
+            supplier_row = known.get(self.supplier_id)
+            current_row = known.get(self.pk)
+
+            if self.supplier_type == 0:
+                self.level = 0
+            elif supplier_row:  # Устанавливаем на один уровень ниже уровня поставщика
+                # Последний рубеж для кода в обход clean() и сериализатора: цикл сломал бы пути поддерева
+                if self.pk is not None and f'/{self.pk}/' in supplier_row['path']:
+                    raise ValidationError({'supplier': SUPPLIER_CYCLE_ERROR})
+                self.level = supplier_row['level'] + 1
+            else:
+                self.level = 1  # Указываем уровень по умолчанию для новых объектов, если поставщик не задан
+
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'level', 'path', 'subtree_debt'}
+
+            supplier_path = supplier_row['path'] if supplier_row else '/'
+            if current_row and current_row['path']:
+                self.path = f'{supplier_path}{self.pk}/'
+                self.subtree_debt = current_row['subtree_debt'] + (self.debt or 0) - (current_row['debt'] or 0)
+                level_delta = self.level - current_row['level']
+                if self.path != current_row['path'] or level_delta:
+                    shift_subtree_levels(current_row['path'], level_delta)
+                    self.move_subtree(current_row['path'], self.path, level_delta)
+                super().save(*args, **kwargs)
+                entity_saved(current_row, self)
+            else:
+                self.subtree_debt = self.debt or 0
+                super().save(*args, **kwargs)
+                self.path = f'{supplier_path}{self.pk}/'
+                NetworkEntity.objects.filter(pk=self.pk).update(path=self.path)
+                entity_saved(None, self)
+
+    @staticmethod
+    def move_subtree(old_path, new_path, level_delta=0):
+        """Переносит узел со всеми потомками: меняет префикс пути и сдвигает уровни одним UPDATE."""
+        NetworkEntity.objects.filter(path__startswith=old_path).update(
+            path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+            level=F('level') + level_delta,
+            updated_at=timezone.now(),
+        )
+        invalidate_bulk(NetworkEntity._meta.label_lower)
+
+    @staticmethod
+    def touch(pks):
+        """Отмечает объекты измененными, например при изменении их продуктов."""
+        pks = {pk for pk in pks if pk is not None}
+        if pks:
+            NetworkEntity.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+            invalidate_objects(NetworkEntity._meta.label_lower, pks)
+
+    def get_ancestor_ids(self):
+        """Возвращает id всех поставщиков по цепочке вверх, начиная с завода."""
+        return [int(pk) for pk in self.path.strip('/').split('/')[:-1] if pk]
+
+    def get_ancestors(self):
+        """Цепочка поставщиков вплоть до завода одним запросом."""
+        return NetworkEntity.objects.filter(pk__in=self.get_ancestor_ids()).order_by('level')
+
+    def get_descendants(self):
+        """Все объекты сети ниже по иерархии одним запросом по индексу пути."""
+        return NetworkEntity.objects.filter(path__startswith=self.path).exclude(pk=self.pk)
 
     def get_admin_url(self):
         return reverse("admin:network_networkentity_change", args=[self.pk])
+
+
+class DebtSummary(models.Model):
+    """
+    Сводная задолженность объектов сети в разрезе страны и уровня иерархии.
+    Поддерживается инкрементально при изменении задолженности, поставщика или страны объекта.
+    """
+    country = models.CharField(max_length=100, verbose_name='страна')
+    level = models.PositiveIntegerField(verbose_name='уровень иерархии')
+    total_debt = models.DecimalField(max_digits=18, decimal_places=2, default=0, verbose_name='сумма задолженности')
+    entity_count = models.PositiveIntegerField(default=0, verbose_name='количество объектов')
+
+    class Meta:
+        verbose_name = 'Сводная задолженность'
+        verbose_name_plural = 'Сводная задолженность'
+        constraints = [
+            models.UniqueConstraint(fields=['country', 'level'], name='network_debtsummary_country_level_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.country}, уровень {self.level}'
+
+
+class AdminJob(models.Model):
+    """
+    Фоновая задача массового действия админки.
+    Выбранные строки хранятся пачками первичных ключей (диапазонами или списками) и обрабатываются
+    в коротких транзакциях.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, 'в очереди'),
+        (STATUS_RUNNING, 'выполняется'),
+        (STATUS_DONE, 'завершена'),
+        (STATUS_FAILED, 'ошибка'),
+    )
+
+    action = models.CharField(max_length=100, verbose_name='действие')
+    model_label = models.CharField(max_length=100, verbose_name='модель')
+    pk_ranges = models.JSONField(default=list, verbose_name='пачки первичных ключей')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True,
+                              verbose_name='статус')
+    total = models.PositiveIntegerField(default=0, verbose_name='всего объектов')
+    processed = models.PositiveIntegerField(default=0, verbose_name='обработано')
+    affected = models.PositiveIntegerField(default=0, verbose_name='изменено')
+    error = models.TextField(verbose_name='ошибка', **NULLABLE)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, verbose_name='создатель', **NULLABLE)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='время создания')
+    started_at = models.DateTimeField(verbose_name='время запуска', **NULLABLE)
+    finished_at = models.DateTimeField(verbose_name='время завершения', **NULLABLE)
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.action} #{self.pk}'
@@ -0,0 +1,108 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Курсорная (keyset) пагинация по первичному ключу.
+    Страница выбирается условием `id > курсор` по индексу, поэтому глубокие страницы
+    стоят столько же, сколько первая.
+    """
+    ordering = ('id',)
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class NetworkEntityCursorPagination(IdCursorPagination):
+    """
+    Курсорная пагинация объектов сети по индексу (created_at, id).
+    """
+    ordering = ('created_at', 'id')
+
+
+class AsyncCursorPaginationMixin:
+    """
+    Выборка страницы курсорной пагинации для асинхронных представлений.
+    Повторяет CursorPagination.paginate_queryset, но строки страницы читает асинхронным ORM,
+    поэтому курсоры и ссылки next/previous совпадают с синхронными представлениями.
+    """
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        if reverse:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+            queryset = queryset.order_by(*ordering)
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            order = self.ordering[0]
+            lookup = 'lt' if self.cursor.reverse != order.startswith('-') else 'gt'
+            queryset = queryset.filter(**{f"{order.lstrip('-')}__{lookup}": current_position})
+
+        results = [row async for row in queryset[offset:offset + self.page_size + 1]]
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering) if has_following_position else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position = following_position
+            self.previous_position = current_position
+        return self.page
+
+
+class AsyncIdCursorPagination(AsyncCursorPaginationMixin, IdCursorPagination):
+    pass
+
+
+class AsyncNetworkEntityCursorPagination(AsyncCursorPaginationMixin, NetworkEntityCursorPagination):
+    pass
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор админки, который для таблицы без фильтров берет оценку числа строк из статистики PostgreSQL
+    вместо `COUNT(*)` по всей таблице. Небольшие таблицы, отфильтрованные выборки и другие СУБД
+    считаются точно.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = self._estimated_count()
+            if estimate is not None and estimate > self.estimate_threshold:
+                return estimate
+        return super().count
+
+    def _estimated_count(self):
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s',
+                           [self.object_list.model._meta.db_table])
+            row = cursor.fetchone()
+        return int(row[0]) if row else None
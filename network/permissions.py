@@ -1,12 +1,17 @@
 from rest_framework.permissions import BasePermission
 
+from users.roles import ais_moderator, is_moderator
+
 
 class IsModerator(BasePermission):
     """
     Проверяет, является ли пользователь модератором.
     """
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='moderators').exists()
+        return is_moderator(request.user)
+
+    async def ahas_permission(self, request, view):
+        return await ais_moderator(request.user)
 
 
 class IsOwner(BasePermission):
@@ -14,7 +19,10 @@ class IsOwner(BasePermission):
     Проверяет, является ли пользователь создателем объекта.
     """
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.creator
+        return obj.creator_id == request.user.pk
+
+    async def ahas_object_permission(self, request, view, obj):
+        return self.has_object_permission(request, view, obj)
 
 
 class IsActiveUser(BasePermission):
@@ -23,3 +31,6 @@ class IsActiveUser(BasePermission):
     """
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.is_active
+
+    async def ahas_permission(self, request, view):
+        return self.has_permission(request, view)
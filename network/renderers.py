@@ -0,0 +1,50 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Рендерер потоковой выгрузки в формате NDJSON.
+    Данные выгрузки отдаются StreamingHttpResponse, рендерер используется для выбора формата
+    и для ответов с ошибками.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (json.dumps(data, ensure_ascii=False) + '\n').encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Рендерер потоковой выгрузки в формате CSV.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = '\n'.join(f'{key},{value}' for key, value in data.items())
+        return f'{data}\n'.encode(self.charset)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson с тем же результатом, что и компактный JSONRenderer DRF.
+    Типы, которые orjson не сериализует сам, передаются кодировщику DRF. Без orjson работает как JSONRenderer.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=JSONEncoder().default)
+        # Как и JSONRenderer, экранируем разделители строк, недопустимые в JavaScript
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
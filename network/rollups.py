@@ -0,0 +1,153 @@
+"""
+Инкрементально поддерживаемые агрегаты задолженности.
+
+`NetworkEntity.subtree_debt` хранит сумму задолженности объекта и всех объектов ниже по иерархии,
+`DebtSummary` - сумму задолженности и число объектов в разрезе страны и уровня.
+Все изменения применяются пачками UPDATE по id из материализованных путей, без сканирования таблицы.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, Func, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import invalidate_bulk
+from .models import DebtSummary, NetworkEntity
+
+
+UPDATE_CHUNK_SIZE = 500
+ZERO = Decimal('0.00')
+
+
+def path_ids(path):
+    """Возвращает id всех узлов материализованного пути."""
+    return [int(pk) for pk in path.strip('/').split('/') if pk]
+
+
+def parent_path(path):
+    """Путь поставщика: материализованный путь без последнего сегмента."""
+    return path[:path.rstrip('/').rfind('/') + 1]
+
+
+def apply_subtree_deltas(items):
+    """
+    Прибавляет изменения задолженности к subtree_debt всех узлов пути.
+    items - пары (путь, изменение); изменения по одному узлу суммируются, а затем применяются
+    одним UPDATE с CASE на пачку узлов.
+    """
+    deltas = defaultdict(Decimal)
+    for path, delta in items:
+        if delta:
+            for pk in path_ids(path):
+                deltas[pk] += delta
+    pks = [pk for pk, delta in deltas.items() if delta]
+    for start in range(0, len(pks), UPDATE_CHUNK_SIZE):
+        chunk = pks[start:start + UPDATE_CHUNK_SIZE]
+        NetworkEntity.objects.filter(pk__in=chunk).update(subtree_debt=F('subtree_debt') + Case(
+            *[When(pk=pk, then=Value(deltas[pk])) for pk in chunk],
+            output_field=DecimalField(max_digits=18, decimal_places=2),
+        ))
+
+
+def apply_summary_deltas(items):
+    """Применяет изменения (страна, уровень, задолженность, количество) к сводной таблице DebtSummary."""
+    groups = defaultdict(lambda: [ZERO, 0])
+    for country, level, debt, count in items:
+        groups[(country, level)][0] += debt or ZERO
+        groups[(country, level)][1] += count
+
+    for (country, level), (debt, count) in groups.items():
+        if not debt and not count:
+            continue
+        summary = DebtSummary.objects.filter(country=country, level=level)
+        changes = {'total_debt': F('total_debt') + debt, 'entity_count': F('entity_count') + count}
+        if summary.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                DebtSummary.objects.create(country=country, level=level, total_debt=debt, entity_count=count)
+        except IntegrityError:  # Строку группы параллельно создал другой процесс
+            summary.update(**changes)
+
+
+def shift_subtree_levels(path, level_delta):
+    """Переносит агрегаты поддерева в сводной таблице на новый уровень перед сдвигом уровней поддерева."""
+    if not level_delta:
+        return
+    groups = NetworkEntity.objects.filter(path__startswith=path).values('country', 'level').annotate(
+        total=Coalesce(Sum('debt'), ZERO), count=Count('pk')
+    ).order_by()
+    items = []
+    for group in groups:
+        items.append((group['country'], group['level'], -group['total'], -group['count']))
+        items.append((group['country'], group['level'] + level_delta, group['total'], group['count']))
+    apply_summary_deltas(items)
+
+
+def entity_saved(old, new):
+    """
+    Обновляет агрегаты после сохранения объекта.
+    old - строка объекта до сохранения (None для нового), new - сохраненный объект.
+    Перенос уровней поддерева к этому моменту уже учтен shift_subtree_levels.
+    """
+    debt = new.debt or ZERO
+    if old is None:
+        apply_subtree_deltas([(parent_path(new.path), debt)])
+        apply_summary_deltas([(new.country, new.level, debt, 1)])
+        return
+
+    old_debt = old['debt'] or ZERO
+    apply_subtree_deltas([
+        (parent_path(old['path']), -old['subtree_debt']),
+        (parent_path(new.path), new.subtree_debt),
+    ])
+    if old['country'] != new.country or old_debt != debt:
+        apply_summary_deltas([
+            (old['country'], new.level, -old_debt, -1),
+            (new.country, new.level, debt, 1),
+        ])
+
+
+def entity_deleted(row):
+    """
+    Вычитает собственную задолженность удаленного объекта из агрегатов.
+    Поддеревья клиентов вычитаются из прежних поставщиков при их отсоединении (entity_detached).
+    """
+    debt = row['debt'] or ZERO
+    apply_subtree_deltas([(parent_path(row['path']), -debt)])
+    apply_summary_deltas([(row['country'], row['level'], -debt, -1)])
+
+
+def entity_detached(path, subtree_debt):
+    """Вычитает поддерево клиента из цепочки его прежних поставщиков."""
+    apply_subtree_deltas([(parent_path(path), -subtree_debt)])
+
+
+def clear_debt(queryset):
+    """Обнуляет задолженность объектов queryset с обновлением агрегатов. Возвращает число обновленных строк."""
+    with transaction.atomic():
+        rows = list(queryset.exclude(debt=0).exclude(debt=None).values_list('path', 'country', 'level', 'debt'))
+        apply_subtree_deltas((path, -debt) for path, _, _, debt in rows)
+        apply_summary_deltas((country, level, -debt, 0) for _, country, level, debt in rows)
+        updated = queryset.update(debt=0, updated_at=timezone.now())
+        invalidate_bulk(NetworkEntity._meta.label_lower)
+        return updated
+
+
+def rebuild():
+    """Полностью пересчитывает агрегаты задолженности, например после массовой загрузки или пересчета уровней."""
+    with transaction.atomic():
+        DebtSummary.objects.all().delete()
+        DebtSummary.objects.bulk_create(
+            DebtSummary(country=group['country'], level=group['level'],
+                        total_debt=group['total'], entity_count=group['count'])
+            for group in NetworkEntity.objects.values('country', 'level').annotate(
+                total=Coalesce(Sum('debt'), ZERO), count=Count('pk')
+            ).order_by()
+        )
+        subtree_total = NetworkEntity.objects.filter(path__startswith=OuterRef('path')).order_by().annotate(
+            total=Func(F('debt'), function='SUM')
+        ).values('total')[:1]
+        NetworkEntity.objects.exclude(path='').update(subtree_debt=Coalesce(Subquery(subtree_total), ZERO))
@@ -0,0 +1,37 @@
+"""
+Поиск участников сети и продуктов с допуском опечаток.
+
+На PostgreSQL поиск идет по сходству слов триграмм (`%>`, `word_similarity`), которое обслуживают
+GIN-индексы `gin_trgm_ops` на искомых колонках, и результаты сортируются по сходству.
+На остальных СУБД (SQLite в тестах) используется `icontains` без ранжирования.
+"""
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+
+ENTITY_SEARCH_FIELDS = ('name', 'city', 'country')
+PRODUCT_SEARCH_FIELDS = ('name', 'model')
+
+
+def search(queryset, query, fields, contains_fields=()):
+    """
+    Фильтрует queryset по строке запроса в указанных полях, лучшие совпадения идут первыми.
+    Поля contains_fields (например, email создателя) ищутся вхождением подстроки и не участвуют в ранжировании.
+    """
+    query = query.strip()
+    condition = Q()
+    for field in contains_fields:
+        condition |= Q(**{f'{field}__icontains': query})
+    if connections[queryset.db].vendor != 'postgresql':
+        for field in fields:
+            condition |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(condition).order_by('pk')
+
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    for field in fields:
+        condition |= Q(**{f'{field}__trigram_word_similar': query})
+    ranks = [TrigramWordSimilarity(query, field) for field in fields]
+    rank = Greatest(*ranks) if len(ranks) > 1 else ranks[0]
+    return queryset.filter(condition).annotate(search_rank=rank).order_by('-search_rank', 'pk')
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 
 from products.serializers import ProductSerializer
-from .models import NetworkEntity
+from .fieldsets import SparseFieldsetSerializerMixin
+from .models import SUPPLIER_CYCLE_ERROR, NetworkEntity
 
 
-class NetworkEntitySerializer(serializers.ModelSerializer):
+class NetworkEntitySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор для объекта сети.
     """
@@ -12,5 +13,49 @@ class NetworkEntitySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = NetworkEntity
-        fields = '__all__'
+        exclude = ['path', 'subtree_debt']
         read_only_fields = ['creator', 'debt']
+        expandable_fields = {'products': 'products'}  # Поле и lookup для prefetch_related
+
+    def validate_supplier(self, supplier):
+        if supplier and self.instance and f'/{self.instance.pk}/' in supplier.path:
+            raise serializers.ValidationError(SUPPLIER_CYCLE_ERROR)
+        return supplier
+
+
+class NetworkEntityImportSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор строки файла импорта сети.
+    Поставщик задается внешним ключом и разрешается импортером пачками, поэтому здесь нет запросов к БД.
+    Тип поставщика по умолчанию подставляется здесь: импортер выбирает по нему уровень и поставщика.
+    """
+    supplier = serializers.CharField(max_length=64, required=False, allow_null=True)
+
+    class Meta:
+        model = NetworkEntity
+        fields = ['external_id', 'supplier', 'name', 'email', 'country', 'city', 'street', 'building_number',
+                  'supplier_type', 'debt']
+        extra_kwargs = {
+            'external_id': {'required': True, 'allow_null': False, 'validators': []},
+            'supplier_type': {'default': NetworkEntity._meta.get_field('supplier_type').default},
+        }
+
+
+class NetworkEntityDebtSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор задолженности объекта сети и всего его поддерева.
+    """
+    class Meta:
+        model = NetworkEntity
+        fields = ['id', 'name', 'debt', 'subtree_debt']
+
+
+class DebtSummarySerializer(serializers.Serializer):
+    """
+    Сериализатор строки сводной задолженности. При группировке по одному измерению
+    второе измерение в строке отсутствует.
+    """
+    country = serializers.CharField(required=False)
+    level = serializers.IntegerField(required=False)
+    total_debt = serializers.DecimalField(max_digits=18, decimal_places=2, source='debt')
+    entity_count = serializers.IntegerField(source='count')
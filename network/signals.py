@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_objects
+from .models import NetworkEntity
+from .rollups import entity_deleted, entity_detached, shift_subtree_levels
+
+
+@receiver(pre_delete, sender=NetworkEntity)
+def subtract_deleted_debt(sender, instance, **kwargs):
+    """Вычитает задолженность удаляемого объекта из агрегатов по актуальной строке из БД."""
+    row = NetworkEntity.objects.filter(pk=instance.pk).values('path', 'country', 'level', 'debt').first()
+    if row:
+        entity_deleted(row)
+
+
+@receiver(post_delete, sender=NetworkEntity)
+def detach_orphaned_clients(sender, instance, **kwargs):
+    """
+    После удаления поставщика его клиенты получают supplier=NULL (SET_NULL) без вызова save().
+    Такие клиенты становятся корнями уровня 1, поэтому их поддеревья переносятся в корень иерархии,
+    а их задолженность вычитается из агрегатов прежних поставщиков.
+    """
+    orphans = NetworkEntity.objects.filter(
+        supplier__isnull=True, path__contains=f'/{instance.pk}/'
+    ).values_list('pk', 'path', 'level', 'subtree_debt')
+    for pk, path, level, subtree_debt in orphans:
+        entity_detached(path, subtree_debt)
+        shift_subtree_levels(path, 1 - level)
+        NetworkEntity.move_subtree(path, f'/{pk}/', 1 - level)
+
+
+@receiver(post_save, sender=NetworkEntity)
+@receiver(post_delete, sender=NetworkEntity)
+def invalidate_entity_responses(sender, instance, **kwargs):
+    """Сбрасывает закешированные ответы с измененным объектом сети и списки объектов."""
+    invalidate_objects(sender._meta.label_lower, [instance.pk])
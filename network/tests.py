@@ -1,9 +1,27 @@
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from network.models import NetworkEntity
+from network import rollups
+from network.cache import cache_stats, get_cache
+from network.checks import check_response_cache_backend
+from network.importers import NetworkImporter
+from network.jobs import collect_pk_chunks, enqueue_job, iter_chunks
+from network.models import SUPPLIER_CYCLE_ERROR, AdminJob, DebtSummary, NetworkEntity
+from products.models import Product
+from users.authentication import RoleRefreshToken
 
 User = get_user_model()
 
@@ -148,3 +166,871 @@ class NetworkEntityAPITests(TestCase):
         response = self.client.delete(reverse('network:networkentity-delete', args=[self.individual.id]))
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(NetworkEntity.objects.count(), 2)
+
+    def test_list_is_cursor_paginated(self):
+        """
+        Тестирует курсорную пагинацию списка объектов сети в порядке создания.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('network:networkentity-list'), {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.factory.id, self.retail_network.id])
+        self.assertNotIn('count', response.data)
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['id'] for item in response.data['results']], [self.individual.id])
+        self.assertIsNone(response.data['next'])
+
+    def test_entity_ancestors(self):
+        """
+        Тестирует получение цепочки поставщиков вплоть до завода.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('network:networkentity-ancestors', args=[self.individual.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data], [self.factory.id, self.retail_network.id])
+
+    def test_entity_descendants(self):
+        """
+        Тестирует получение всех участников сети ниже по иерархии.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('network:networkentity-descendants', args=[self.factory.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {item['id'] for item in response.data['results']}, {self.retail_network.id, self.individual.id}
+        )
+
+    def test_supplier_change_moves_subtree(self):
+        """
+        Тестирует, что при смене поставщика пути всего поддерева пересчитываются.
+        """
+        other_factory = NetworkEntity.objects.create(
+            creator=self.user, name='Другой завод', email='factory2@test.com', country='Россия', supplier_type=0
+        )
+        self.retail_network.supplier = other_factory
+        self.retail_network.save()
+
+        self.individual.refresh_from_db()
+        self.assertEqual(
+            self.individual.path, f'/{other_factory.id}/{self.retail_network.id}/{self.individual.id}/'
+        )
+        self.assertFalse(self.factory.get_descendants().exists())
+
+    def test_supplier_change_relevels_subtree(self):
+        """
+        Тестирует, что при смене поставщика уровни всех клиентов ниже по иерархии пересчитываются.
+        """
+        self.individual.supplier = self.factory
+        self.individual.save()
+        self.retail_network.supplier = self.individual
+        self.retail_network.save()
+
+        self.assertEqual(self.individual.level, 1)
+        self.retail_network.refresh_from_db()
+        self.assertEqual(self.retail_network.level, 2)
+
+        self.individual.supplier = None
+        self.individual.save()
+
+        self.retail_network.refresh_from_db()
+        self.assertEqual((self.individual.level, self.retail_network.level), (1, 2))
+        self.assertEqual(self.retail_network.path, f'/{self.individual.id}/{self.retail_network.id}/')
+
+    def test_supplier_cycle_is_rejected(self):
+        """
+        Тестирует, что клиента нельзя назначить поставщиком его же поставщика.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        data = {
+            'name': 'Розничная сеть',
+            'email': 'retail@test.com',
+            'country': 'Россия',
+            'supplier_type': 1,
+            'supplier': self.individual.id
+        }
+
+        response = self.client.put(reverse('network:networkentity-update', args=[self.retail_network.id]), data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deleted_supplier_detaches_clients(self):
+        """
+        Тестирует, что после удаления поставщика его клиенты становятся корнями иерархии.
+        """
+        self.retail_network.delete()
+
+        self.individual.refresh_from_db()
+        self.assertIsNone(self.individual.supplier)
+        self.assertEqual(self.individual.path, f'/{self.individual.id}/')
+        self.assertEqual(self.individual.level, 1)
+
+    def test_relevel_network_command(self):
+        """
+        Тестирует массовый пересчет уровней и путей командой relevel_network.
+        """
+        NetworkEntity.objects.update(level=7, path='')
+
+        call_command('relevel_network', stdout=StringIO())
+
+        levels = dict(NetworkEntity.objects.values_list('pk', 'level'))
+        self.assertEqual(levels, {self.factory.id: 0, self.retail_network.id: 1, self.individual.id: 2})
+        self.individual.refresh_from_db()
+        self.assertEqual(
+            self.individual.path, f'/{self.factory.id}/{self.retail_network.id}/{self.individual.id}/'
+        )
+
+    def test_export_ndjson(self):
+        """
+        Тестирует потоковую выгрузку объектов сети в NDJSON с поставщиками и уровнями.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('network:networkentity-export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(
+            [(row['id'], row['supplier_id'], row['level']) for row in rows],
+            [(self.factory.id, None, 0), (self.retail_network.id, self.factory.id, 1),
+             (self.individual.id, self.retail_network.id, 2)]
+        )
+
+    def test_export_csv(self):
+        """
+        Тестирует потоковую выгрузку объектов сети в CSV.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('network:networkentity-export'), {'format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,external_id,name'))
+        self.assertEqual(len(lines), 4)
+
+    def test_list_filters(self):
+        """
+        Тестирует фильтры списка объектов сети.
+        """
+        self.client.force_authenticate(user=self.user)
+        url = reverse('network:networkentity-list')
+        NetworkEntity.objects.filter(pk=self.individual.pk).update(debt=Decimal('500.00'))
+
+        def ids(params):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [row['id'] for row in response.data['results']]
+
+        self.assertEqual(ids({'supplier': self.factory.id}), [self.retail_network.id])
+        self.assertEqual(ids({'level': 2, 'creator': self.other_user.id}), [self.individual.id])
+        self.assertEqual(ids({'supplier_type': 1, 'country': 'Россия'}), [self.retail_network.id])
+        self.assertEqual(ids({'debt_min': 100}), [self.individual.id])
+        self.assertEqual(ids({'debt_max': 100}), [self.factory.id, self.retail_network.id])
+        self.assertEqual(ids({'created_before': '2000-01-01T00:00:00Z'}), [])
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_conditional_get_detail(self):
+        """
+        Тестирует ответ 304 по ETag и смену ETag при изменении продуктов объекта.
+        """
+        self.client.force_authenticate(user=self.user)
+        url = reverse('network:networkentity-detail', args=[self.factory.id])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        Product.objects.create(creator=self.user, network_entity=self.factory, name='Продукт', model='Модель')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_conditional_get_list(self):
+        """
+        Тестирует, что ETag списка меняется при удалении объекта.
+        """
+        self.client.force_authenticate(user=self.user)
+        url = reverse('network:networkentity-list')
+
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.individual.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_conditional_get_list_does_not_scan_table(self):
+        """
+        Тестирует, что 304 для страницы списка обходится одним запросом MAX(updated_at) по индексу,
+        без COUNT по всей выборке.
+        """
+        self.client.force_authenticate(user=self.user)
+        url = reverse('network:networkentity-list')
+        etag = self.client.get(url, {'country': 'Россия'})['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'country': 'Россия'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        sql = [query['sql'] for query in queries]
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('COUNT(', sql[0])
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql[0]}')
+                plan = ' '.join(row[3] for row in cursor.fetchall())
+            self.assertIn('INDEX', plan)
+            self.assertNotRegex(plan, r'SCAN network_networkentity(?! USING)')
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_sparse_fieldset(self):
+        """
+        Тестирует выбор полей: лишние колонки не читаются, продукты не подгружаются без expand.
+        """
+        self.client.force_authenticate(user=self.user)
+        url = reverse('network:networkentity-list')
+
+        with self.assertNumQueries(2) as context:
+            response = self.client.get(url, {'fields': 'id,name,debt'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name', 'debt'})
+        self.assertNotIn('email', context.captured_queries[-1]['sql'])
+
+        response = self.client.get(url, {'fields': 'id', 'expand': 'products'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'products'})
+
+        response = self.client.get(url)
+        self.assertIn('products', response.data['results'][0])
+
+        response = self.client.get(url, {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False, FAST_LIST_ENDPOINTS=False)
+    def test_sparse_fieldset_reads_cursor_columns(self):
+        """
+        Тестирует, что на пути сериализатора курсор строится без дочитывания отложенных полей сортировки.
+        """
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('network:networkentity-list'), {'fields': 'id,name', 'page_size': 1})
+        self.assertIsNotNone(response.data['next'])
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+
+    def test_search_network_entities(self):
+        """
+        Тестирует поиск объектов сети по названию и ограничение выдачи.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('network:networkentity-search'), {'q': 'Иванов'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data], [self.individual.id])
+
+        response = self.client.get(reverse('network:networkentity-search'), {'q': 'Россия', 'limit': 2})
+        self.assertEqual(len(response.data), 2)
+
+        response = self.client.get(reverse('network:networkentity-search'), {'q': ' '})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('network:networkentity-search'), {'q': 'Завод', 'limit': 1000})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class NetworkEntityQueryBudgetTests(TestCase):
+    """
+    Проверяет, что число SQL-запросов эндпоинтов не растет вместе с количеством объектов сети.
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='user@test.com', password='password123')
+        self.client.force_authenticate(user=self.user)
+
+        self.factory = NetworkEntity.objects.create(
+            creator=self.user, name='Завод', email='factory@test.com', country='Россия', supplier_type=0
+        )
+        supplier = self.factory
+        for index in range(5):
+            supplier = NetworkEntity.objects.create(
+                creator=self.user, name=f'Сеть {index}', email=f'retail{index}@test.com',
+                country='Россия', supplier=supplier, supplier_type=1
+            )
+            for number in range(3):
+                Product.objects.create(
+                    creator=self.user, network_entity=supplier, name=f'Продукт {number}', model='Модель',
+                    release_date='2024-01-01'
+                )
+        self.leaf = supplier
+
+    def test_list_query_budget(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('network:networkentity-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_detail_query_budget(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('network:networkentity-detail', args=[self.leaf.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_ancestors_query_budget(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('network:networkentity-ancestors', args=[self.leaf.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_descendants_query_budget(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('network:networkentity-descendants', args=[self.factory.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class NetworkImportTests(TestCase):
+    """
+    Тесты потокового импорта объектов сети.
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='user@test.com', password='password123')
+        self.factory = NetworkEntity.objects.create(
+            creator=self.user, name='Завод', email='factory@test.com', country='Россия', supplier_type=0,
+            external_id='factory'
+        )
+
+    def test_import_jsonl_resolves_suppliers_in_topological_order(self):
+        """
+        Тестирует импорт JSONL, где клиенты идут раньше поставщиков, а часть поставщиков уже есть в БД.
+        """
+        rows = [
+            {'external_id': 'ip', 'supplier': 'retail', 'name': 'ИП', 'email': 'ip@test.com',
+             'country': 'Россия', 'supplier_type': 2},
+            {'external_id': 'retail', 'supplier': 'factory', 'name': 'Сеть', 'email': 'retail@test.com',
+             'country': 'Россия', 'supplier_type': 1},
+            {'external_id': 'broken', 'name': 'Без email', 'country': 'Россия', 'supplier_type': 1},
+            {'external_id': 'orphan', 'supplier': 'missing', 'name': 'Сирота', 'email': 'orphan@test.com',
+             'country': 'Россия', 'supplier_type': 1},
+        ]
+        upload = SimpleUploadedFile(
+            'network.jsonl', '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows).encode()
+        )
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(reverse('network:networkentity-import'), {'file': upload})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual({error['line'] for error in response.data['errors']}, {3, 4})
+
+        retail = NetworkEntity.objects.get(external_id='retail')
+        ip = NetworkEntity.objects.get(external_id='ip')
+        self.assertEqual((retail.level, ip.level), (1, 2))
+        self.assertEqual(ip.supplier, retail)
+        self.assertEqual(ip.path, f'/{self.factory.id}/{retail.id}/{ip.id}/')
+
+    def test_reimport_with_existing_supplier_in_same_batch(self):
+        """
+        Тестирует повторный импорт: строка поставщика отклоняется как существующая,
+        но клиенты из той же пачки привязываются к нему по БД.
+        """
+        importer = NetworkImporter(self.user.pk)
+        report = importer.run([
+            (1, {'external_id': 'factory', 'name': 'Завод', 'email': 'factory@test.com', 'country': 'Россия',
+                 'supplier_type': 0}),
+            (2, {'external_id': 'client', 'supplier': 'factory', 'name': 'Сеть', 'email': 'client@test.com',
+                 'country': 'Россия', 'supplier_type': 1}),
+        ])
+        self.assertEqual(report['created'], 1)
+        self.assertEqual([error['line'] for error in report['errors']], [1])
+        self.assertEqual(NetworkEntity.objects.get(external_id='client').supplier, self.factory)
+
+    def test_import_without_supplier_type(self):
+        """
+        Тестирует импорт CSV без колонки типа поставщика и с пустым значением: применяется тип по умолчанию.
+        """
+        self.client.force_authenticate(user=self.user)
+        for name, content in (
+                ('no_column.csv', 'external_id,name,email,country\nf1,Завод 1,f1@test.com,Россия\n'),
+                ('empty.csv', 'external_id,name,email,country,supplier_type\nf2,Завод 2,f2@test.com,Россия,\n')):
+            with self.subTest(name=name):
+                upload = SimpleUploadedFile(name, content.encode())
+                response = self.client.post(reverse('network:networkentity-import'), {'file': upload})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual((response.data['created'], response.data['errors']), (1, []))
+        self.assertEqual(
+            set(NetworkEntity.objects.filter(external_id__in=['f1', 'f2']).values_list('supplier_type', 'level')),
+            {(0, 0)}
+        )
+
+    def test_import_network_command_csv(self):
+        """
+        Тестирует импорт CSV командой import_network небольшими пачками.
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', delete=False) as stream:
+            stream.write('external_id,supplier,name,email,country,city,supplier_type,debt\n')
+            stream.write('r1,factory,Сеть 1,r1@test.com,Россия,Москва,1,10.50\n')
+            stream.write('r2,r1,ИП 2,r2@test.com,Россия,,2,\n')
+            stream.write('r3,r2,ИП 3,r3@test.com,Россия,,2,\n')
+        self.addCleanup(os.remove, stream.name)
+
+        call_command('import_network', stream.name, creator='user@test.com', batch_size=1, stdout=StringIO())
+
+        levels = dict(NetworkEntity.objects.filter(external_id__startswith='r').values_list('external_id', 'level'))
+        self.assertEqual(levels, {'r1': 1, 'r2': 2, 'r3': 3})
+        self.assertEqual(str(NetworkEntity.objects.get(external_id='r1').debt), '10.50')
+
+
+class DebtRollupTests(TestCase):
+    """
+    Тесты инкрементально поддерживаемых агрегатов задолженности.
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='user@test.com', password='password123')
+        self.client.force_authenticate(user=self.user)
+
+        self.factory = NetworkEntity.objects.create(
+            creator=self.user, name='Завод', email='factory@test.com', country='Россия', supplier_type=0
+        )
+        self.retail = NetworkEntity.objects.create(
+            creator=self.user, name='Сеть', email='retail@test.com', country='Россия', supplier=self.factory,
+            supplier_type=1, debt=Decimal('100.00')
+        )
+        self.ip = NetworkEntity.objects.create(
+            creator=self.user, name='ИП', email='ip@test.com', country='Казахстан', supplier=self.retail,
+            supplier_type=2, debt=Decimal('10.00')
+        )
+
+    def assertRollupsConsistent(self):
+        """Сравнивает поддерживаемые агрегаты с полным пересчетом."""
+        subtree = dict(NetworkEntity.objects.values_list('pk', 'subtree_debt'))
+        summary = set(DebtSummary.objects.exclude(entity_count=0).values_list('country', 'level', 'total_debt',
+                                                                              'entity_count'))
+        rollups.rebuild()
+        self.assertEqual(subtree, dict(NetworkEntity.objects.values_list('pk', 'subtree_debt')))
+        self.assertEqual(summary, set(DebtSummary.objects.values_list('country', 'level', 'total_debt',
+                                                                      'entity_count')))
+
+    def test_subtree_debt_endpoint(self):
+        response = self.client.get(reverse('network:networkentity-debt', args=[self.factory.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['subtree_debt'], '110.00')
+
+    def test_rollups_follow_debt_supplier_and_country_changes(self):
+        """
+        Тестирует обновление агрегатов при изменении задолженности, поставщика, страны и при удалении.
+        """
+        self.ip.debt = Decimal('25.00')
+        self.ip.save()
+        self.assertRollupsConsistent()
+
+        self.ip.supplier = self.factory
+        self.ip.country = 'Россия'
+        self.ip.save()
+        self.assertRollupsConsistent()
+
+        self.retail.supplier = self.ip
+        self.retail.save()
+        self.assertRollupsConsistent()
+
+        self.ip.delete()
+        self.assertRollupsConsistent()
+        self.factory.refresh_from_db()
+        self.assertEqual(self.factory.subtree_debt, Decimal('0.00'))
+
+    def test_debt_summary_endpoint(self):
+        response = self.client.get(reverse('network:debt-summary'), {'group_by': 'country'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['country'], row['total_debt'], row['entity_count']) for row in response.data],
+            [('Казахстан', '10.00', 1), ('Россия', '100.00', 2)]
+        )
+
+        response = self.client.get(reverse('network:debt-summary'), {'country': 'Россия', 'level': 1})
+        self.assertEqual(response.data, [{'country': 'Россия', 'level': 1, 'total_debt': '100.00', 'entity_count': 1}])
+
+
+class NetworkGeneratorTests(TestCase):
+    """
+    Тесты генератора синтетической сети.
+    """
+    def test_generate_network(self):
+        existing_user = User.objects.create_user(email='user@test.com', password='password123')
+        NetworkEntity.objects.create(creator=existing_user, name='Завод', email='factory@test.com',
+                                     country='Россия', supplier_type=0)
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('generate_network', entities=200, depth=3, branching=3, products=4, creators=3,
+                         seed=1, stdout=StringIO())
+        # Запросы идут пачками и по группам сводной таблицы, а не на каждую строку
+        self.assertLess(len(queries), 200)
+        # Вторая загрузка мелкими пачками дописывает сеть к уже существующей
+        call_command('generate_network', entities=40, depth=3, branching=3, products=4, creators=3,
+                     batch_size=7, seed=2, stdout=StringIO())
+
+        self.assertEqual(NetworkEntity.objects.count(), 241)
+        self.assertEqual(User.objects.filter(email__startswith='generator-').count(), 3)
+        entities = {entity.pk: entity for entity in NetworkEntity.objects.all()}
+        for entity in entities.values():
+            supplier = entities.get(entity.supplier_id)
+            if entity.supplier_type == 0:
+                self.assertEqual((entity.level, entity.path, entity.supplier_id), (0, f'/{entity.pk}/', None))
+            else:
+                self.assertEqual(entity.level, supplier.level + 1)
+                self.assertEqual(entity.path, f'{supplier.path}{entity.pk}/')
+            self.assertLessEqual(entity.level, 3)
+            self.assertEqual(entity.subtree_debt, sum(other.debt for other in entities.values()
+                                                      if other.path.startswith(entity.path)))
+
+        # Ассортимент клиентов унаследован от поставщиков
+        catalog = set(Product.objects.values_list('network_entity_id', 'name', 'model'))
+        for entity_id, name, model in catalog:
+            supplier_id = entities[entity_id].supplier_id
+            if supplier_id is not None:
+                self.assertIn((supplier_id, name, model), catalog)
+
+        summary = set(DebtSummary.objects.values_list('country', 'level', 'total_debt', 'entity_count'))
+        rollups.rebuild()
+        self.assertEqual(summary, set(DebtSummary.objects.values_list('country', 'level', 'total_debt',
+                                                                      'entity_count')))
+
+        # Последовательность ключей сдвинута за выданные генератором значения
+        created = NetworkEntity.objects.create(creator=existing_user, name='Новый', email='new@test.com',
+                                               country='Россия', supplier_type=0)
+        self.assertGreater(created.pk, max(entities))
+
+
+@override_settings(ADMIN_JOBS_MODE='sync', ADMIN_JOBS_CHUNK_SIZE=2)
+class AdminJobTests(TestCase):
+    """
+    Тесты фонового выполнения массовых действий админки.
+    """
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.factory = NetworkEntity.objects.create(
+            creator=self.admin, name='Завод', email='factory@test.com', country='Россия', supplier_type=0
+        )
+        self.clients = [
+            NetworkEntity.objects.create(
+                creator=self.admin, name=f'Сеть {i}', email=f'retail{i}@test.com', country='Россия',
+                supplier=self.factory, supplier_type=1, debt=Decimal('10.00')
+            )
+            for i in range(5)
+        ]
+
+    def test_iter_chunks_splits_ranges(self):
+        self.assertEqual(list(iter_chunks([[1, 5], [9, 9], [11, 15, [11, 15]]], 2)),
+                         [(1, 2, None), (3, 4, None), (5, 5, None), (9, 9, None), (11, 15, [11, 15])])
+
+    def test_sparse_selection_chunked_by_selected_rows(self):
+        """
+        Тестирует, что выборка с пропусками делится по числу выбранных строк, а не на строку на пачку.
+        """
+        selected = [client.pk for client in self.clients[::2]] + [self.factory.pk]
+        chunks, total = collect_pk_chunks(NetworkEntity.objects.filter(pk__in=selected), 2)
+        self.assertEqual(total, 4)
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(sum(len(chunk[2]) if len(chunk) == 3 else chunk[1] - chunk[0] + 1 for chunk in chunks), 4)
+
+        job = enqueue_job('clear_supplier_debt', NetworkEntity.objects.filter(pk__in=selected), self.admin)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total, job.processed, job.affected), (AdminJob.STATUS_DONE, 4, 4, 4))
+        self.assertEqual(set(NetworkEntity.objects.filter(debt__gt=0).values_list('pk', flat=True)),
+                         {self.clients[1].pk, self.clients[3].pk})
+
+    def test_contiguous_selection_stored_as_range(self):
+        chunks, total = collect_pk_chunks(NetworkEntity.objects.all(), 2)
+        self.assertEqual((chunks, total), ([[self.factory.pk, self.clients[-1].pk]], 6))
+
+    def test_clear_supplier_debt_job(self):
+        queryset = NetworkEntity.objects.filter(pk__in=[client.pk for client in self.clients[:4]])
+        job = enqueue_job('clear_supplier_debt', queryset, self.admin)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, AdminJob.STATUS_DONE)
+        self.assertEqual((job.total, job.processed, job.affected), (4, 4, 4))
+        self.assertEqual(NetworkEntity.objects.filter(debt__gt=0).count(), 1)
+        self.factory.refresh_from_db()
+        self.assertEqual(self.factory.subtree_debt, Decimal('10.00'))
+
+    def test_admin_action_reports_job(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('admin:network_networkentity_changelist'), {
+            'action': 'clear_supplier_debt',
+            '_selected_action': [client.pk for client in self.clients],
+        }, follow=True)
+        job = AdminJob.objects.get()
+        self.assertContains(response, reverse('admin:network_adminjob_change', args=[job.pk]))
+        self.assertEqual(job.status, AdminJob.STATUS_DONE)
+
+        response = self.client.get(reverse('admin:network_adminjob_changelist'))
+        self.assertContains(response, '5/5 (100%)')
+
+    def test_run_admin_jobs_command_processes_queue(self):
+        with override_settings(ADMIN_JOBS_MODE='worker'):
+            job = enqueue_job('clear_supplier_debt', NetworkEntity.objects.all(), self.admin)
+        self.assertEqual(AdminJob.objects.get(pk=job.pk).status, AdminJob.STATUS_QUEUED)
+
+        call_command('run_admin_jobs', '--once', stdout=StringIO())
+        self.assertEqual(AdminJob.objects.get(pk=job.pk).status, AdminJob.STATUS_DONE)
+        self.assertFalse(NetworkEntity.objects.filter(debt__gt=0).exists())
+
+
+@override_settings(ADMIN_INLINE_PRODUCTS_LIMIT=2)
+class NetworkEntityAdminTests(TestCase):
+    """
+    Тесты производительности страниц админки объектов сети.
+    """
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_login(self.admin)
+        self.factory = NetworkEntity.objects.create(
+            creator=self.admin, name='Завод', email='factory@test.com', country='Россия', supplier_type=0
+        )
+
+    def create_clients(self, count):
+        for index in range(count):
+            NetworkEntity.objects.create(
+                creator=self.admin, name=f'Сеть {index}', email=f'retail{index}@test.com', country='Россия',
+                supplier=self.factory, supplier_type=1
+            )
+
+    def test_changelist_query_count_does_not_grow(self):
+        url = reverse('admin:network_networkentity_changelist')
+        self.create_clients(2)
+        with self.assertNumQueries(5):
+            self.client.get(url)
+        self.create_clients(10)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_large_catalog_is_linked_instead_of_inlined(self):
+        url = reverse('admin:network_networkentity_change', args=[self.factory.pk])
+        Product.objects.create(creator=self.admin, network_entity=self.factory, name='Продукт', model='Модель')
+        self.assertContains(self.client.get(url), 'products-TOTAL_FORMS')
+
+        for number in range(2):
+            Product.objects.create(creator=self.admin, network_entity=self.factory, name=f'Продукт {number}',
+                                   model='Модель')
+        response = self.client.get(url)
+        self.assertNotContains(response, 'products-TOTAL_FORMS')
+        self.assertContains(response, f'?network_entity__id__exact={self.factory.pk}')
+
+        response = self.client.get(reverse('admin:products_product_changelist'),
+                                   {'network_entity__id__exact': self.factory.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_descendant_supplier_rejected_by_form(self):
+        retail = NetworkEntity.objects.create(creator=self.admin, name='Сеть', email='retail@test.com',
+                                              country='Россия', supplier=self.factory, supplier_type=1)
+        ip = NetworkEntity.objects.create(creator=self.admin, name='ИП', email='ip@test.com', country='Россия',
+                                          supplier=retail, supplier_type=2)
+        data = {
+            'creator': self.admin.pk, 'name': 'Сеть', 'email': 'retail@test.com', 'country': 'Россия',
+            'supplier': ip.pk, 'supplier_type': 1, 'debt': '0.00',
+            'products-TOTAL_FORMS': 0, 'products-INITIAL_FORMS': 0,
+        }
+        response = self.client.post(reverse('admin:network_networkentity_change', args=[retail.pk]), data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.context['adminform'].form.errors['supplier'], [SUPPLIER_CYCLE_ERROR])
+        retail.refresh_from_db()
+        self.assertEqual(retail.supplier, self.factory)
+
+    def test_search_by_creator_email(self):
+        other = User.objects.create_user(email='supplier-owner@test.com', password='password123')
+        NetworkEntity.objects.create(creator=other, name='Чужая сеть', email='other@test.com', country='Россия',
+                                     supplier=self.factory, supplier_type=1)
+        response = self.client.get(reverse('admin:network_networkentity_changelist'), {'q': 'supplier-owner'})
+        self.assertContains(response, 'Чужая сеть')
+        self.assertNotContains(response, 'factory@test.com')
+
+
+class ResponseCacheTests(TestCase):
+    """
+    Тесты кеша ответов эндпоинтов чтения и его сброса сигналами.
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='user@test.com', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.factory = NetworkEntity.objects.create(
+            creator=self.user, name='Завод', email='factory@test.com', country='Россия', supplier_type=0
+        )
+        self.retail = NetworkEntity.objects.create(
+            creator=self.user, name='Сеть', email='retail@test.com', country='Казахстан', supplier=self.factory,
+            supplier_type=1
+        )
+
+    def test_repeated_read_is_served_from_cache(self):
+        url = reverse('network:networkentity-detail', args=[self.factory.id])
+        stats = cache_stats()
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['name'], 'Завод')
+        self.assertEqual(cache_stats()['hits'], stats['hits'] + 1)
+
+        # Счетчики попаданий не пишутся в общий кеш
+        with mock.patch.object(get_cache(), 'incr') as incr:
+            self.client.get(url)
+        incr.assert_not_called()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_filters_are_part_of_key(self):
+        url = reverse('network:networkentity-list')
+        self.client.get(url, {'country': 'Россия'})
+        response = self.client.get(url, {'country': 'Казахстан'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.retail.id])
+
+    def test_save_invalidates_only_changed_object(self):
+        factory_url = reverse('network:networkentity-detail', args=[self.factory.id])
+        retail_url = reverse('network:networkentity-detail', args=[self.retail.id])
+        self.client.get(factory_url)
+        self.client.get(retail_url)
+
+        self.retail.name = 'Новая сеть'
+        self.retail.save()
+        self.assertEqual(self.client.get(factory_url)['X-Cache'], 'HIT')
+        response = self.client.get(retail_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['name'], 'Новая сеть')
+
+    def test_product_change_invalidates_entity_and_lists(self):
+        url = reverse('network:networkentity-detail', args=[self.factory.id])
+        self.client.get(url)
+        self.client.get(reverse('products:product-list'))
+
+        Product.objects.create(creator=self.user, network_entity=self.factory, name='Продукт', model='Модель')
+        self.assertEqual(len(self.client.get(url).json()['products']), 1)
+        self.assertEqual(len(self.client.get(reverse('products:product-list')).json()['results']), 1)
+
+    def test_process_local_backend_rejected_for_deploy(self):
+        responses = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        with override_settings(DEBUG=False, CACHES={'default': responses, 'responses': responses}):
+            self.assertEqual([error.id for error in check_response_cache_backend(None)], ['network.E001'])
+        shared = {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'response_cache'}
+        with override_settings(DEBUG=False, CACHES={'default': responses, 'responses': shared}):
+            self.assertEqual(check_response_cache_backend(None), [])
+
+    def test_bulk_update_invalidates_details(self):
+        url = reverse('network:networkentity-detail', args=[self.retail.id])
+        self.client.get(url)
+        NetworkEntity.objects.filter(pk=self.retail.pk).update(debt=Decimal('50.00'))
+        rollups.clear_debt(NetworkEntity.objects.filter(pk=self.retail.pk))
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class FastListEquivalenceTests(TestCase):
+    """
+    Сравнивает ответы быстрого пути списков (.values()) и обычного пути через сериализатор байт в байт.
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='user@test.com', password='password123')
+        self.client.force_authenticate(user=self.user)
+
+        factory = NetworkEntity.objects.create(
+            creator=self.user, name='Завод "кавычки"\u2028\\', email='factory@test.com', country='Россия',
+            city='Москва', supplier_type=0
+        )
+        supplier = factory
+        for index in range(4):
+            supplier = NetworkEntity.objects.create(
+                creator=self.user, name=f'Сеть {index}', email=f'retail{index}@test.com', country='Казахстан',
+                supplier=supplier, supplier_type=index % 2 + 1, debt=Decimal('1234.5') * index
+            )
+        Product.objects.create(creator=self.user, network_entity=factory, name='Продукт', model=None,
+                               release_date=None)
+        Product.objects.create(creator=self.user, network_entity=factory, name='Продукт 2', model='Модель',
+                               description='Описание', release_date='2024-05-01')
+        Product.objects.create(creator=self.user, network_entity=supplier, name='Продукт', model='Модель',
+                               release_date='2023-01-31')
+
+    def assertPathsEqual(self, url, params):
+        with self.settings(FAST_LIST_ENDPOINTS=True):
+            fast = self.client.get(url, params)
+        with self.settings(FAST_LIST_ENDPOINTS=False):
+            slow = self.client.get(url, params)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+        return fast.json()
+
+    def test_network_list_matches_serializer(self):
+        url = reverse('network:networkentity-list')
+        for params in ({}, {'fields': 'id,name,debt'}, {'fields': 'id,updated_at', 'expand': 'products'},
+                       {'country': 'Казахстан'}, {'page_size': 2}):
+            with self.subTest(params=params):
+                self.assertPathsEqual(url, params)
+
+        data = self.assertPathsEqual(url, {'page_size': 2})
+        self.assertPathsEqual(data['next'], {})
+
+    def test_product_list_matches_serializer(self):
+        url = reverse('products:product-list')
+        for params in ({}, {'fields': 'release_date,name'}, {'page_size': 1}):
+            with self.subTest(params=params):
+                self.assertPathsEqual(url, params)
+
+    def test_renderer_without_orjson_matches(self):
+        url = reverse('network:networkentity-list')
+        for params in ({}, {'expand': 'products'}):
+            with self.subTest(params=params):
+                fast = self.client.get(url, params)
+                with mock.patch('network.renderers.orjson', None):
+                    fallback = self.client.get(url, params)
+                self.assertEqual(fallback.status_code, status.HTTP_200_OK)
+                self.assertEqual(fast.content, fallback.content)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class AsyncViewTests(TestCase):
+    """
+    Тесты асинхронных эндпоинтов чтения: ответы совпадают с синхронными эндпоинтами.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@test.com', password='password123')
+        self.auth = {'Authorization': f'Bearer {RoleRefreshToken.for_user(self.user).access_token}'}
+        self.factory = NetworkEntity.objects.create(
+            creator=self.user, name='Завод', email='factory@test.com', country='Россия', supplier_type=0,
+            debt=Decimal('10.50')
+        )
+        for index in range(3):
+            NetworkEntity.objects.create(
+                creator=self.user, name=f'Сеть {index}', email=f'retail{index}@test.com', country='Казахстан',
+                supplier=self.factory, supplier_type=1
+            )
+        self.product = Product.objects.create(creator=self.user, network_entity=self.factory, name='Продукт',
+                                              model='Модель', release_date='2024-01-01')
+
+    async def assertSameAsSync(self, name, params, args=()):
+        app, url_name = name.split(':')
+        response = await self.async_client.get(reverse(f'{app}_async:{url_name}', args=args), params, headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = await self.async_client.get(reverse(name, args=args), params, headers=self.auth)
+        self.assertEqual(response.content.replace(b'/async/', b'/'), expected.content)
+        return response.json()
+
+    async def test_network_list_and_detail(self):
+        data = await self.assertSameAsSync('network:networkentity-list', {'page_size': 2})
+        self.assertIsNotNone(data['next'])
+        await self.assertSameAsSync('network:networkentity-list', {'country': 'Казахстан', 'fields': 'id,name'})
+        await self.assertSameAsSync('network:networkentity-detail', {}, args=[self.factory.id])
+
+    async def test_product_list_and_detail(self):
+        await self.assertSameAsSync('products:product-list', {})
+        await self.assertSameAsSync('products:product-detail', {'fields': 'id,name'}, args=[self.product.id])
+
+    async def test_authentication_and_not_found(self):
+        response = await self.async_client.get(reverse('network_async:networkentity-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await self.async_client.get(reverse('network_async:networkentity-detail', args=[0]), headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
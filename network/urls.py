@@ -6,7 +6,14 @@ from .views import (
     NetworkEntityDetailView,
     NetworkEntityUpdateView,
     NetworkEntityDeleteView,
-    NetworkEntityListView
+    NetworkEntityListView,
+    NetworkEntitySearchView,
+    NetworkEntityAncestorsView,
+    NetworkEntityDescendantsView,
+    NetworkEntityImportView,
+    NetworkEntityExportView,
+    NetworkEntityDebtView,
+    DebtSummaryView
 )
 
 
@@ -15,7 +22,15 @@ app_name = NetworkConfig.name
 urlpatterns = [
     path('network/', NetworkEntityListView.as_view(), name='networkentity-list'),
     path('network/create/', NetworkEntityCreateView.as_view(), name='networkentity-create'),
+    path('network/search/', NetworkEntitySearchView.as_view(), name='networkentity-search'),
+    path('network/import/', NetworkEntityImportView.as_view(), name='networkentity-import'),
+    path('network/export/', NetworkEntityExportView.as_view(), name='networkentity-export'),
+    path('network/debt/summary/', DebtSummaryView.as_view(), name='debt-summary'),
+    path('network/<int:pk>/debt/', NetworkEntityDebtView.as_view(), name='networkentity-debt'),
     path('network/<int:pk>/', NetworkEntityDetailView.as_view(), name='networkentity-detail'),
     path('network/<int:pk>/update/', NetworkEntityUpdateView.as_view(), name='networkentity-update'),
     path('network/<int:pk>/delete/', NetworkEntityDeleteView.as_view(), name='networkentity-delete'),
+    path('network/<int:pk>/ancestors/', NetworkEntityAncestorsView.as_view(), name='networkentity-ancestors'),
+    path('network/<int:pk>/descendants/', NetworkEntityDescendantsView.as_view(),
+         name='networkentity-descendants'),
 ]
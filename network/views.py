@@ -1,10 +1,29 @@
+from django.conf import settings
+from django.db.models import F, Max, Sum
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, permissions
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
 
-from .models import NetworkEntity
+from users.roles import is_moderator
+from .cache import CachedResponseMixin, get_versions, list_version_key
+from .exporters import NETWORK_EXPORT_FIELDS, iter_export
+from .fastpath import FastListMixin
+from .fieldsets import SparseFieldsetMixin
+from .filters import NetworkEntityFilter
+from .importers import IMPORT_FORMATS, NetworkImporter, detect_format, open_text, read_rows
+from .models import DebtSummary, NetworkEntity
+from .paginators import NetworkEntityCursorPagination
 from .permissions import IsOwner, IsModerator, IsActiveUser
-from .serializers import NetworkEntitySerializer
+from .renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer
+from .search import ENTITY_SEARCH_FIELDS, search
+from .serializers import DebtSummarySerializer, NetworkEntityDebtSerializer, NetworkEntitySerializer
 
 
 class NetworkEntityCreateView(generics.CreateAPIView):
@@ -17,29 +36,115 @@ class NetworkEntityCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsActiveUser]
 
     def perform_create(self, serializer):
-        serializer.save(creator=self.request.user)
+        serializer.save(creator_id=self.request.user.pk)
 
 
-class NetworkEntityListView(generics.ListAPIView):
+class ConditionalGetMixin:
+    """
+    Условный GET по заголовкам If-None-Match / If-Modified-Since до загрузки и сериализации объектов;
+    при совпадении возвращается 304.
+
+    Для объекта валидатором служит его updated_at (изменение продуктов тоже обновляет updated_at объекта сети).
+    Для списка стоимость не должна зависеть от размера выборки и номера страницы, поэтому ETag строится
+    из версии списков модели в кеше ответов (ее увеличивает любое создание, изменение и удаление,
+    в том числе массовое) и MAX(updated_at) всей таблицы по индексу updated_at. Удаление не меняет
+    MAX(updated_at), поэтому для списков 304 выдается только по If-None-Match.
+    """
+    def get_validators(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg not in self.kwargs:
+            return self.get_list_validators()
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        last_modified = queryset.order_by().aggregate(last_modified=Max('updated_at'))['last_modified']
+        if last_modified is None:
+            return None, None
+        timestamp = last_modified.timestamp()
+        return quote_etag(f'{int(timestamp * 1000000)}'), timestamp
+
+    def get_list_validators(self):
+        model = self.get_queryset().model
+        last_modified = model._default_manager.aggregate(last_modified=Max('updated_at'))['last_modified']
+        if last_modified is None:
+            return None, None
+        version, = get_versions([list_version_key(self.cache_label)])
+        timestamp = last_modified.timestamp()
+        return quote_etag(f'{version}-{int(timestamp * 1000000)}'), timestamp
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return super().get(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified) if lookup_url_kwarg in self.kwargs else None
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class NetworkEntityListView(SparseFieldsetMixin, CachedResponseMixin, ConditionalGetMixin, FastListMixin,
+                            generics.ListAPIView):
     """
     API-представление для создания нового участника сети.
     Позволяет аутентифицированным и активным пользователям просматривать список всех участников сети.
     """
-    queryset = NetworkEntity.objects.all()
+    queryset = NetworkEntity.objects.prefetch_related('products')
     serializer_class = NetworkEntitySerializer
     filter_backends = [DjangoFilterBackend]
     permission_classes = [permissions.IsAuthenticated, IsActiveUser]
-    filterset_fields = ['country']  # Позволяет фильтровать по стране
+    cache_label = NetworkEntity._meta.label_lower
+    filterset_class = NetworkEntityFilter
+    pagination_class = NetworkEntityCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
 
-class NetworkEntityDetailView(generics.RetrieveAPIView):
+class SearchMixin:
+    """
+    Поиск по строке `?q=` с допуском опечаток в полях `search_on`.
+    Возвращает не больше `?limit=` лучших совпадений без пагинации.
+    """
+    search_on = ()
+    pagination_class = None
+
+    def filter_queryset(self, queryset):
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'Не указан поисковый запрос.'})
+        limit = self.request.query_params.get('limit', settings.SEARCH_PAGE_SIZE)
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        if not 0 < limit <= settings.SEARCH_MAX_PAGE_SIZE:
+            raise ValidationError({'limit': f'Допустимы значения от 1 до {settings.SEARCH_MAX_PAGE_SIZE}.'})
+        return search(queryset, query, self.search_on)[:limit]
+
+
+class NetworkEntitySearchView(SparseFieldsetMixin, SearchMixin, generics.ListAPIView):
+    """
+    API-представление для поиска участников сети по названию, городу и стране с допуском опечаток.
+    """
+    queryset = NetworkEntity.objects.prefetch_related('products')
+    serializer_class = NetworkEntitySerializer
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    search_on = ENTITY_SEARCH_FIELDS
+
+
+class NetworkEntityDetailView(SparseFieldsetMixin, CachedResponseMixin, ConditionalGetMixin,
+                              generics.RetrieveAPIView):
     """
     API-представление для создания нового участника сети.
     Позволяет аутентифицированным и активным пользователям просматривать детали конкретного участника сети.
     """
-    queryset = NetworkEntity.objects.all()
+    queryset = NetworkEntity.objects.prefetch_related('products')
     serializer_class = NetworkEntitySerializer
     permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    cache_label = NetworkEntity._meta.label_lower
 
 
 class NetworkEntityUpdateView(generics.UpdateAPIView):
@@ -47,15 +152,13 @@ class NetworkEntityUpdateView(generics.UpdateAPIView):
     API-представление для создания нового участника сети.
     Позволяет владельцу или модератору редактировать информацию об участнике сети.
     """
-    queryset = NetworkEntity.objects.all()
+    queryset = NetworkEntity.objects.prefetch_related('products')
     serializer_class = NetworkEntitySerializer
     permission_classes = [permissions.IsAuthenticated, IsActiveUser, IsOwner | IsModerator]
 
     def perform_update(self, serializer):
         user = self.request.user
-        network_id = self.kwargs['pk']
-        network = NetworkEntity.objects.get(pk=network_id)
-        if network.creator == user or user.groups.filter(name='moderators').exists():
+        if serializer.instance.creator_id == user.pk or is_moderator(user):
             serializer.save()
         else:
             raise PermissionDenied("У вас нет разрешения редактировать этот раздел.")
@@ -68,3 +171,110 @@ class NetworkEntityDeleteView(generics.DestroyAPIView):
     """
     queryset = NetworkEntity.objects.all()
     permission_classes = [permissions.IsAuthenticated, IsActiveUser, IsOwner | IsModerator]
+
+
+class NetworkEntityAncestorsView(SparseFieldsetMixin, generics.ListAPIView):
+    """
+    API-представление для получения цепочки поставщиков участника сети вплоть до завода.
+    Цепочка строится по материализованному пути одним запросом независимо от глубины иерархии.
+    """
+    serializer_class = NetworkEntitySerializer
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    pagination_class = None  # Цепочка ограничена глубиной иерархии
+
+    def get_queryset(self):
+        entity = get_object_or_404(NetworkEntity.objects.only('path'), pk=self.kwargs['pk'])
+        return entity.get_ancestors().prefetch_related('products')
+
+
+class NetworkEntityDescendantsView(SparseFieldsetMixin, generics.ListAPIView):
+    """
+    API-представление для получения всех участников сети ниже по иерархии.
+    Поддерево выбирается по префиксу материализованного пути одним запросом.
+    """
+    serializer_class = NetworkEntitySerializer
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+
+    def get_queryset(self):
+        entity = get_object_or_404(NetworkEntity.objects.only('path'), pk=self.kwargs['pk'])
+        return entity.get_descendants().prefetch_related('products')
+
+
+class NetworkEntityImportView(generics.GenericAPIView):
+    """
+    API-представление для потокового импорта участников сети из файла CSV или JSONL.
+    Поставщики указываются внешним ключом (`supplier`), объекты вставляются пачками в топологическом порядке.
+    """
+    parser_classes = [MultiPartParser]
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Файл импорта не передан.'})
+        file_format = request.data.get('file_format') or detect_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            raise ValidationError({'file_format': f"Поддерживаются форматы: {', '.join(IMPORT_FORMATS)}."})
+
+        importer = NetworkImporter(request.user.pk)
+        return Response(importer.run(read_rows(open_text(upload.file), file_format)))
+
+
+class StreamingExportMixin:
+    """
+    Потоковая выгрузка queryset в формате, выбранном параметром `?format=ndjson|csv` или заголовком Accept.
+    """
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    export_fields = None
+    export_filename = None
+
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            iter_export(self.get_queryset(), self.export_fields, renderer.format),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{self.export_filename}.{renderer.format}"'
+        return response
+
+
+class NetworkEntityExportView(StreamingExportMixin, generics.GenericAPIView):
+    """
+    API-представление для потоковой выгрузки всех участников сети с поставщиками и уровнями.
+    """
+    queryset = NetworkEntity.objects.all()
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    export_fields = NETWORK_EXPORT_FIELDS
+    export_filename = 'network'
+
+
+class NetworkEntityDebtView(generics.RetrieveAPIView):
+    """
+    API-представление для получения задолженности участника сети и суммарной задолженности всех объектов
+    ниже по иерархии. Сумма читается из поддерживаемого агрегата, а не считается по поддереву.
+    """
+    queryset = NetworkEntity.objects.only('id', 'name', 'debt', 'subtree_debt')
+    serializer_class = NetworkEntityDebtSerializer
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+
+
+class DebtSummaryView(generics.ListAPIView):
+    """
+    API-представление для сводной задолженности по странам и уровням иерархии.
+    Параметр `group_by=country` или `group_by=level` сворачивает сводку по одному измерению.
+    """
+    queryset = DebtSummary.objects.order_by('country', 'level')
+    serializer_class = DebtSummarySerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['country', 'level']
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    pagination_class = None  # Размер сводки ограничен числом стран и уровней
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        group_by = self.request.query_params.get('group_by')
+        if group_by not in ('country', 'level'):
+            return queryset.values('country', 'level', debt=F('total_debt'), count=F('entity_count'))
+        return queryset.values(group_by).annotate(
+            debt=Sum('total_debt'), count=Sum('entity_count')
+        ).order_by(group_by)
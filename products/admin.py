@@ -1,9 +1,20 @@
 from django.contrib import admin
+from network.paginators import EstimatedCountPaginator
+from network.search import PRODUCT_SEARCH_FIELDS, search
 from .models import Product
 
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('network_entity', 'creator', 'name', 'model', 'release_date')
-    search_fields = ('name', 'model')
-    list_filter = ('network_entity',)
+    list_select_related = ('network_entity', 'creator')
+    search_fields = PRODUCT_SEARCH_FIELDS + ('network_entity__name',)
+    autocomplete_fields = ('network_entity', 'creator')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск идет по триграммным индексам продуктов и названия объекта сети
+        if not search_term:
+            return queryset, False
+        return search(queryset, search_term, self.search_fields), False
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from .apps import ProductsConfig
+from .async_views import AsyncProductDetailView, AsyncProductListView
+
+
+app_name = f'{ProductsConfig.name}_async'
+
+urlpatterns = [
+    path('products/', AsyncProductListView.as_view(), name='product-list'),
+    path('products/<int:pk>/', AsyncProductDetailView.as_view(), name='product-detail'),
+]
@@ -0,0 +1,23 @@
+from network.async_views import AsyncDetailView, AsyncListView
+from network.paginators import AsyncIdCursorPagination
+from .filters import ProductFilter
+from .models import Product
+from .serializers import ProductSerializer
+
+
+class AsyncProductListView(AsyncListView):
+    """
+    Асинхронное API-представление списка продуктов с фильтрами и курсорной пагинацией.
+    """
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    filterset_class = ProductFilter
+    pagination_class = AsyncIdCursorPagination
+
+
+class AsyncProductDetailView(AsyncDetailView):
+    """
+    Асинхронное API-представление информации о продукте.
+    """
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
@@ -0,0 +1,17 @@
+import django_filters
+
+from .models import Product
+
+
+class ProductFilter(django_filters.FilterSet):
+    """
+    Фильтры списка продуктов по объекту сети и дате выхода на рынок.
+    Объект сети фильтруется по id без проверочного запроса к таблице сети.
+    """
+    network_entity = django_filters.NumberFilter(field_name='network_entity_id')
+    release_after = django_filters.DateFilter(field_name='release_date', lookup_expr='gte')
+    release_before = django_filters.DateFilter(field_name='release_date', lookup_expr='lte')
+
+    class Meta:
+        model = Product
+        fields = ['release_date']
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='release_date',
+            field=models.DateField(blank=True, null=True, verbose_name='дата выхода на рынок'),
+        ),
+    ]
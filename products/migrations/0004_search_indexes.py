@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+INDEXES = {
+    'products_name_trgm_idx': 'name',
+    'products_model_trgm_idx': 'model',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Создает триграммные GIN-индексы для поиска. На других СУБД поиск работает без индексов."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON products_product USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_alter_product_release_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0009_filter_indexes'),
+        ('products', '0004_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['network_entity', 'id'], name='products_entity_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['release_date', 'id'], name='products_release_date_idx'),
+        ),
+    ]
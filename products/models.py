@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from network.cache import invalidate_objects
 from network.models import NetworkEntity
 from django.contrib.auth import get_user_model
 
@@ -8,6 +9,42 @@ User = get_user_model()
 NULLABLE = {'blank': True, 'null': True}
 
 
+class ProductManager(models.Manager):
+    def copy_from_supplier(self, client, creator_id, batch_size=1000, **filters):
+        """
+        Копирует ассортимент поставщика клиенту пачками через bulk_create.
+        Продукты, которые уже есть у клиента (по названию и модели), пропускаются.
+        Дополнительные фильтры сужают копируемый ассортимент, например `name__in=[...]`.
+        Возвращает пару (скопировано, пропущено).
+        """
+        if client.supplier_id is None:
+            return 0, 0
+
+        existing = set(self.filter(network_entity=client).values_list('name', 'model'))
+        source = self.filter(network_entity_id=client.supplier_id, **filters).values(
+            'name', 'model', 'description', 'release_date'
+        )
+        copied = skipped = 0
+        batch = []
+        with transaction.atomic():
+            for row in source.iterator(chunk_size=batch_size):
+                key = (row['name'], row['model'])
+                if key in existing:
+                    skipped += 1
+                    continue
+                existing.add(key)
+                batch.append(self.model(creator_id=creator_id, network_entity_id=client.pk, **row))
+                if len(batch) >= batch_size:
+                    copied += len(self.bulk_create(batch))
+                    batch = []
+            if batch:
+                copied += len(self.bulk_create(batch))
+            if copied:
+                NetworkEntity.touch([client.pk])
+                invalidate_objects(self.model._meta.label_lower, [])
+        return copied, skipped
+
+
 class Product(models.Model):
     creator = models.ForeignKey(User, on_delete=models.PROTECT, verbose_name='создатель')
     network_entity = models.ForeignKey(NetworkEntity, on_delete=models.CASCADE, related_name='products')
@@ -15,10 +52,25 @@ class Product(models.Model):
     model = models.CharField(max_length=255, verbose_name='модель продукта', **NULLABLE)
     description = models.TextField(verbose_name='описание продукта', **NULLABLE)
     release_date = models.DateField(verbose_name='дата выхода на рынок', **NULLABLE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name='время изменения')
+
+    objects = ProductManager()
 
     class Meta:
         verbose_name = 'Продукт'
         verbose_name_plural = 'Продукты'
+        indexes = [
+            # Фильтры списка и порядок курсорной пагинации по id
+            models.Index(fields=['network_entity', 'id'], name='products_entity_id_idx'),
+            models.Index(fields=['release_date', 'id'], name='products_release_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.model})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Прежний объект сети нужен обработчику post_save, чтобы при переносе отметить измененными оба объекта
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_network_entity_id = instance.__dict__.get('network_entity_id')
+        return instance
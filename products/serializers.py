@@ -1,8 +1,17 @@
+from django.db import transaction
 from rest_framework import serializers
+
+from network.cache import invalidate_objects
+from network.fieldsets import SparseFieldsetSerializerMixin
+from network.models import NetworkEntity
 from .models import Product
 
 
-class ProductSerializer(serializers.ModelSerializer):
+BULK_MAX_ITEMS = 10000
+BULK_BATCH_SIZE = 1000
+
+
+class ProductSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор для продукта.
     """
@@ -36,3 +45,89 @@ class ProductSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Продукт должен существовать у поставщика."
             )
+
+
+class ProductBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор одного продукта в массовой загрузке.
+    Объект сети принимается как id и проверяется вместе с остальными продуктами в ProductBulkCreateSerializer,
+    чтобы не делать запрос на каждый продукт.
+    """
+    network_entity = serializers.IntegerField(source='network_entity_id', min_value=1)
+
+    class Meta:
+        model = Product
+        fields = ['name', 'model', 'description', 'release_date', 'network_entity']
+
+
+class ProductBulkCreateSerializer(serializers.Serializer):
+    """
+    Сериализатор массового создания продуктов.
+    Все продукты проверяются по ассортименту поставщиков несколькими запросами на весь список
+    и вставляются через bulk_create пачками.
+    """
+    products = ProductBulkItemSerializer(many=True, allow_empty=False, max_length=BULK_MAX_ITEMS)
+
+    def validate_products(self, items):
+        entities = {
+            pk: (supplier_type, supplier_id)
+            for pk, supplier_type, supplier_id in NetworkEntity.objects.filter(
+                pk__in={item['network_entity_id'] for item in items}
+            ).values_list('pk', 'supplier_type', 'supplier_id')
+        }
+        supplier_ids = {supplier_id for supplier_type, supplier_id in entities.values() if supplier_type != 0}
+
+        # Ассортимент поставщиков: уже сохраненные продукты и продукты из этой же загрузки
+        catalog = set(Product.objects.filter(
+            network_entity_id__in=supplier_ids - {None},
+            name__in={item['name'] for item in items},
+        ).values_list('network_entity_id', 'name', 'model'))
+        catalog.update((item['network_entity_id'], item['name'], item.get('model')) for item in items)
+
+        errors = []
+        for item in items:
+            entity = entities.get(item['network_entity_id'])
+            if entity is None:
+                errors.append({'network_entity': ['Объект сети не найден.']})
+            elif entity[0] != 0 and (entity[1], item['name'], item.get('model')) not in catalog:
+                errors.append({'non_field_errors': ['Продукт должен существовать у поставщика.']})
+            else:
+                errors.append({})
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def create(self, validated_data):
+        creator_id = validated_data['creator_id']
+        products = [Product(creator_id=creator_id, **item) for item in validated_data['products']]
+        with transaction.atomic():
+            products = Product.objects.bulk_create(products, batch_size=BULK_BATCH_SIZE)
+            NetworkEntity.touch({product.network_entity_id for product in products})
+            invalidate_objects(Product._meta.label_lower, [])
+        return products
+
+
+class ProductInheritSerializer(serializers.Serializer):
+    """
+    Сериализатор копирования ассортимента поставщика клиенту.
+    Без фильтров копируется весь ассортимент, иначе только продукты с указанными id, названиями или моделями.
+    """
+    network_entity = serializers.PrimaryKeyRelatedField(queryset=NetworkEntity.objects.only('pk', 'supplier_id',
+                                                                                            'creator_id'))
+    product_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    names = serializers.ListField(child=serializers.CharField(), required=False, allow_empty=False)
+    models = serializers.ListField(child=serializers.CharField(), required=False, allow_empty=False)
+
+    def validate_network_entity(self, network_entity):
+        if network_entity.supplier_id is None:
+            raise serializers.ValidationError("У объекта сети нет поставщика.")
+        return network_entity
+
+    def save(self, **kwargs):
+        filters = {}
+        for field, lookup in (('product_ids', 'pk__in'), ('names', 'name__in'), ('models', 'model__in')):
+            if field in self.validated_data:
+                filters[lookup] = self.validated_data[field]
+        return Product.objects.copy_from_supplier(
+            self.validated_data['network_entity'], kwargs['creator_id'], **filters
+        )
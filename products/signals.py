@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from network.cache import invalidate_objects
+from network.models import NetworkEntity
+from .models import Product
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_responses(sender, instance, **kwargs):
+    """Сбрасывает закешированные ответы с измененным продуктом и списки продуктов."""
+    invalidate_objects(sender._meta.label_lower, [instance.pk])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def touch_network_entity(sender, instance, **kwargs):
+    """
+    Изменение или удаление продукта, в том числе удаление queryset, отмечает измененным объект сети,
+    которому он принадлежит (а при переносе - и прежний объект), чтобы валидаторы условных запросов
+    и кеш детальной информации учитывали каталог.
+    """
+    NetworkEntity.touch([instance.network_entity_id, getattr(instance, '_loaded_network_entity_id', None)])
+    instance._loaded_network_entity_id = instance.network_entity_id
@@ -209,3 +209,202 @@ class ProductAPITests(TestCase):
         response = self.client.delete(reverse('products:product-delete', args=[self.product2.id]))
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Product.objects.count(), 1)
+
+    def test_bulk_create_products(self):
+        """
+        Тестирует массовое создание продуктов с проверкой ассортимента поставщиков, включая продукты
+        поставщика из этой же загрузки.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        data = {'products': [
+            {'name': 'Новый продукт', 'model': 'Новая модель', 'release_date': '2024-03-01',
+             'network_entity': self.factory.id},
+            {'name': 'Новый продукт', 'model': 'Новая модель', 'release_date': '2024-03-01',
+             'network_entity': self.retail_network.id},
+            {'name': 'Продукт 1', 'model': 'Модель 1', 'network_entity': self.retail_network.id},
+        ]}
+
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse('products:product-bulk-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'created': 3})
+        self.assertEqual(Product.objects.filter(creator=self.user, name='Новый продукт').count(), 2)
+
+    def test_bulk_create_rejects_products_missing_at_supplier(self):
+        """
+        Тестирует, что массовая загрузка отклоняется целиком, если хотя бы одного продукта нет у поставщика.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        data = {'products': [
+            {'name': 'Продукт 1', 'model': 'Модель 1', 'network_entity': self.retail_network.id},
+            {'name': 'Несуществующий продукт', 'network_entity': self.retail_network.id},
+        ]}
+
+        response = self.client.post(reverse('products:product-bulk-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['products'][0], {})
+        self.assertIn('Продукт должен существовать у поставщика.', str(response.data['products'][1]))
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_inherit_supplier_catalog(self):
+        """
+        Тестирует копирование ассортимента поставщика с пропуском уже имеющихся у клиента продуктов.
+        """
+        Product.objects.create(
+            creator=self.user, network_entity=self.factory, name='Продукт 2', model='Модель 2',
+            release_date='2024-01-01'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(
+            reverse('products:product-inherit'), {'network_entity': self.retail_network.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'copied': 1, 'skipped': 1})
+        self.assertTrue(Product.objects.filter(network_entity=self.retail_network, name='Продукт 2').exists())
+
+    def test_inherit_requires_owner_or_moderator(self):
+        """
+        Тестирует, что копировать ассортимент может только владелец объекта сети или модератор.
+        """
+        self.client.force_authenticate(user=self.other_user)
+
+        response = self.client.post(
+            reverse('products:product-inherit'), {'network_entity': self.retail_network.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_products(self):
+        """
+        Тестирует потоковую выгрузку каталога продуктов.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('products:product-export'), {'format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,network_entity_id,name,model,description,release_date,creator_id')
+        self.assertEqual(len(lines), 3)
+
+    def test_list_filters(self):
+        """
+        Тестирует фильтры списка продуктов по объекту сети и дате выхода.
+        """
+        self.client.force_authenticate(user=self.user)
+        url = reverse('products:product-list')
+
+        response = self.client.get(url, {'network_entity': self.retail_network.id})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.product2.id])
+
+        response = self.client.get(url, {'release_after': '2024-01-15'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.product2.id])
+
+        response = self.client.get(url, {'release_before': '2024-01-15', 'network_entity': self.factory.id})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.product1.id])
+
+    def test_conditional_get_product(self):
+        """
+        Тестирует ответ 304 по Last-Modified продукта.
+        """
+        self.client.force_authenticate(user=self.user)
+        url = reverse('products:product-detail', args=[self.product1.id])
+
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2001 00:00:00 GMT')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_product_changes_touch_network_entity(self):
+        """
+        Тестирует, что изменение и перенос продукта отмечают измененными объекты сети.
+        """
+        NetworkEntity.objects.update(updated_at='2001-01-01T00:00:00Z')
+        product = Product.objects.get(pk=self.product2.pk)
+        product.network_entity = self.factory
+        product.save()
+        self.assertFalse(NetworkEntity.objects.filter(updated_at__year=2001).exists())
+
+    def test_queryset_delete_touches_network_entity(self):
+        """
+        Тестирует, что удаление продуктов queryset сбрасывает кеш и валидаторы детальной информации объекта сети.
+        """
+        self.client.force_authenticate(user=self.user)
+        url = reverse('network:networkentity-detail', args=[self.factory.id])
+        etag = self.client.get(url, {'expand': 'products'})['ETag']
+
+        Product.objects.filter(network_entity=self.factory).delete()
+        response = self.client.get(url, {'expand': 'products'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['products'], [])
+
+    def test_sparse_fieldset(self):
+        """
+        Тестирует выбор полей продукта.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('products:product-detail', args=[self.product1.id]), {'fields': 'id,name'})
+        self.assertEqual(response.data, {'id': self.product1.id, 'name': 'Продукт 1'})
+
+    def test_search_products(self):
+        """
+        Тестирует поиск продуктов по модели.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('products:product-search'), {'q': 'Модель 1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data], [self.product1.id, self.product2.id])
+
+
+class ProductQueryBudgetTests(TestCase):
+    """
+    Проверяет, что число SQL-запросов эндпоинтов продуктов не растет вместе с количеством продуктов.
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='user@test.com', password='password123')
+        self.client.force_authenticate(user=self.user)
+
+        self.factory = NetworkEntity.objects.create(
+            creator=self.user, name='Завод', email='factory@test.com', country='Россия', supplier_type=0
+        )
+        for number in range(10):
+            self.product = Product.objects.create(
+                creator=self.user, network_entity=self.factory, name=f'Продукт {number}', model='Модель',
+                release_date='2024-01-01'
+            )
+
+    def test_list_query_budget(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('products:product-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_is_cursor_paginated(self):
+        response = self.client.get(reverse('products:product-list'), {'page_size': 4})
+        self.assertEqual(len(response.data['results']), 4)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 4)
+
+    def test_detail_query_budget(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('products:product-detail', args=[self.product.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_query_budget(self):
+        """
+        Тестирует, что при обновлении продукта роли не запрашиваются повторно, а объект не перечитывается.
+        """
+        with self.assertNumQueries(5):
+            response = self.client.put(
+                reverse('products:product-update', args=[self.product.id]),
+                {'name': 'Обновленный продукт', 'model': 'Модель', 'network_entity': self.factory.id}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
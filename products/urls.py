@@ -3,7 +3,11 @@ from django.urls import path
 from .apps import ProductsConfig
 from .views import (
     ProductCreateView,
+    ProductBulkCreateView,
+    ProductInheritView,
+    ProductExportView,
     ProductListView,
+    ProductSearchView,
     ProductDetailView,
     ProductUpdateView,
     ProductDeleteView
@@ -15,6 +19,10 @@ app_name = ProductsConfig.name
 urlpatterns = [
     path('products/', ProductListView.as_view(), name='product-list'),
     path('products/create/', ProductCreateView.as_view(), name='product-create'),
+    path('products/bulk_create/', ProductBulkCreateView.as_view(), name='product-bulk-create'),
+    path('products/inherit/', ProductInheritView.as_view(), name='product-inherit'),
+    path('products/search/', ProductSearchView.as_view(), name='product-search'),
+    path('products/export/', ProductExportView.as_view(), name='product-export'),
     path('products/<int:pk>/', ProductDetailView.as_view(), name='product-detail'),
     path('products/<int:pk>/update/', ProductUpdateView.as_view(), name='product-update'),
     path('products/<int:pk>/delete/', ProductDeleteView.as_view(), name='product-delete'),
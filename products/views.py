@@ -1,9 +1,21 @@
-from rest_framework import generics, permissions
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, permissions, status
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
 
+from network.exporters import PRODUCT_EXPORT_FIELDS
 from network.permissions import IsOwner, IsModerator, IsActiveUser
+from network.search import PRODUCT_SEARCH_FIELDS
+from network.cache import CachedResponseMixin
+from network.fastpath import FastListMixin
+from network.fieldsets import SparseFieldsetMixin
+from network.renderers import FastJSONRenderer
+from network.views import ConditionalGetMixin, SearchMixin, StreamingExportMixin
+from users.roles import is_moderator
+from .filters import ProductFilter
 from .models import Product
-from .serializers import ProductSerializer
+from .serializers import ProductSerializer, ProductBulkCreateSerializer, ProductInheritSerializer
 
 
 class ProductCreateView(generics.CreateAPIView):
@@ -16,20 +28,69 @@ class ProductCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsActiveUser]
 
     def perform_create(self, serializer):
-        serializer.save(creator=self.request.user)
+        serializer.save(creator_id=self.request.user.pk)
 
 
-class ProductListView(generics.ListAPIView):
+class ProductBulkCreateView(generics.GenericAPIView):
+    """
+    API-представление для массового создания продуктов.
+    Принимает до нескольких тысяч продуктов в поле `products` и возвращает количество созданных.
+    """
+    serializer_class = ProductBulkCreateSerializer
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        products = serializer.save(creator_id=request.user.pk)
+        return Response({'created': len(products)}, status=status.HTTP_201_CREATED)
+
+
+class ProductInheritView(generics.GenericAPIView):
+    """
+    API-представление для копирования ассортимента поставщика объекту сети.
+    Позволяет владельцу объекта сети или модератору перенести весь ассортимент или его часть одним запросом.
+    """
+    serializer_class = ProductInheritSerializer
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        network_entity = serializer.validated_data['network_entity']
+        if network_entity.creator_id != request.user.pk and not is_moderator(request.user):
+            raise PermissionDenied("У вас нет разрешения редактировать этот раздел.")
+        copied, skipped = serializer.save(creator_id=request.user.pk)
+        return Response({'copied': copied, 'skipped': skipped}, status=status.HTTP_201_CREATED)
+
+
+class ProductListView(SparseFieldsetMixin, CachedResponseMixin, ConditionalGetMixin, FastListMixin,
+                      generics.ListAPIView):
     """
     API-представление для получения списка всех продуктов.
     Позволяет аутентифицированным и активным пользователям просматривать список всех продуктов.
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    filter_backends = [DjangoFilterBackend]
     permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    cache_label = Product._meta.label_lower
+    filterset_class = ProductFilter
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
 
-class ProductDetailView(generics.RetrieveAPIView):
+class ProductSearchView(SparseFieldsetMixin, SearchMixin, generics.ListAPIView):
+    """
+    API-представление для поиска продуктов по названию и модели с допуском опечаток.
+    """
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    search_on = PRODUCT_SEARCH_FIELDS
+
+
+class ProductDetailView(SparseFieldsetMixin, CachedResponseMixin, ConditionalGetMixin,
+                        generics.RetrieveAPIView):
     """
     API-представление для получения информации о продукте по его ID.
     Позволяет аутентифицированным и активным пользователям просматривать детали конкретного продукта.
@@ -37,6 +98,7 @@ class ProductDetailView(generics.RetrieveAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    cache_label = Product._meta.label_lower
 
 
 class ProductUpdateView(generics.UpdateAPIView):
@@ -50,9 +112,7 @@ class ProductUpdateView(generics.UpdateAPIView):
 
     def perform_update(self, serializer):
         user = self.request.user
-        product_id = self.kwargs['pk']
-        product = Product.objects.get(pk=product_id)
-        if product.creator == user or user.groups.filter(name='moderators').exists():
+        if serializer.instance.creator_id == user.pk or is_moderator(user):
             serializer.save()
         else:
             raise PermissionDenied("У вас нет разрешения редактировать этот раздел.")
@@ -65,3 +125,13 @@ class ProductDeleteView(generics.DestroyAPIView):
     """
     queryset = Product.objects.all()
     permission_classes = [permissions.IsAuthenticated, IsActiveUser, IsOwner | IsModerator]
+
+
+class ProductExportView(StreamingExportMixin, generics.GenericAPIView):
+    """
+    API-представление для потоковой выгрузки всего каталога продуктов.
+    """
+    queryset = Product.objects.all()
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    export_fields = PRODUCT_EXPORT_FIELDS
+    export_filename = 'products'
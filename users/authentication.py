@@ -0,0 +1,44 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .roles import MODERATOR_ROLE, is_moderator
+
+
+def set_role_claims(token, user):
+    """Записывает в токен claims, по которым проверяются разрешения без обращения к БД."""
+    token['is_active'] = user.is_active
+    token['is_moderator'] = is_moderator(user)
+    return token
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh-токен с claims ролей. Claims копируются в выпускаемые по нему access-токены.
+    """
+    @classmethod
+    def for_user(cls, user):
+        return set_role_claims(super().for_user(user), user)
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Пользователь, собранный из claims access-токена без загрузки строки users.User.
+    Изменения ролей и блокировка пользователя вступают в силу не позже истечения access-токена.
+    """
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', False)
+
+    @cached_property
+    def is_moderator(self):
+        return self.token.get('is_moderator', False)
+
+    @cached_property
+    def _roles_cache(self):
+        return frozenset({MODERATOR_ROLE}) if self.is_moderator else frozenset()
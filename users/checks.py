@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from network.checks import PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches, deploy=True)
+def check_roles_cache_backend(app_configs, **kwargs):
+    """
+    Закешированные роли сбрасываются при сохранении пользователя только в кеше, куда пишет обработавший
+    его воркер. С кешем процесса пониженный модератор сохранял бы права в остальных воркерах до истечения TTL.
+    """
+    if settings.DEBUG or not settings.USER_ROLES_CACHE_TIMEOUT:
+        return []
+    backend = settings.CACHES[settings.USER_ROLES_CACHE_ALIAS]['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f'Кеш ролей пользователей использует {backend}, сброс ролей не виден другим процессам.',
+        hint='Укажите в USER_ROLES_CACHE_ALIAS общий кеш (по умолчанию кеш ответов с общим бэкендом) '
+             'или отключите кеширование ролей: USER_ROLES_CACHE_TIMEOUT=0.',
+        id='users.E001',
+    )]
@@ -2,6 +2,8 @@ from django.contrib.auth.base_user import BaseUserManager
 from django.db import models
 from django.contrib.auth.models import AbstractUser, Group
 
+from .roles import MODERATOR_ROLE, invalidate_user_roles
+
 
 NULLABLE = {'blank': True, 'null': True}
 
@@ -48,9 +50,10 @@ class User(AbstractUser):
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         # Обновление группы модераторов
-        moderators_group, _ = Group.objects.get_or_create(name='moderators')
+        moderators_group, _ = Group.objects.get_or_create(name=MODERATOR_ROLE)
 
         if self.is_moderator:
             self.groups.add(moderators_group)
         else:
             self.groups.remove(moderators_group)
+        invalidate_user_roles(self)
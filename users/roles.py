@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.cache import caches
+
+
+MODERATOR_ROLE = 'moderators'
+ROLES_CACHE_KEY = 'users:roles:{}'
+
+
+def get_cache():
+    return caches[settings.USER_ROLES_CACHE_ALIAS]
+
+
+def get_user_roles(user):
+    """
+    Возвращает роли пользователя (имена его групп).
+    Роли вычисляются один раз на экземпляр пользователя, то есть один раз за запрос.
+    Если задан USER_ROLES_CACHE_TIMEOUT, роли дополнительно кешируются между запросами
+    в общем для воркеров кеше USER_ROLES_CACHE_ALIAS и сбрасываются при сохранении пользователя
+    или изменении его групп.
+    """
+    if not user or not user.is_authenticated:
+        return frozenset()
+
+    roles = getattr(user, '_roles_cache', None)
+    if roles is None:
+        timeout = settings.USER_ROLES_CACHE_TIMEOUT
+        key = ROLES_CACHE_KEY.format(user.pk)
+        roles = get_cache().get(key) if timeout else None
+        if roles is None:
+            roles = frozenset(user.groups.values_list('name', flat=True))
+            if timeout:
+                get_cache().set(key, roles, timeout)
+        user._roles_cache = roles
+    return roles
+
+
+async def aget_user_roles(user):
+    """Асинхронная версия get_user_roles на асинхронном ORM и асинхронном API кеша."""
+    if not user or not user.is_authenticated:
+        return frozenset()
+
+    roles = getattr(user, '_roles_cache', None)
+    if roles is None:
+        timeout = settings.USER_ROLES_CACHE_TIMEOUT
+        key = ROLES_CACHE_KEY.format(user.pk)
+        roles = await get_cache().aget(key) if timeout else None
+        if roles is None:
+            roles = frozenset([name async for name in user.groups.values_list('name', flat=True)])
+            if timeout:
+                await get_cache().aset(key, roles, timeout)
+        user._roles_cache = roles
+    return roles
+
+
+def has_role(user, role):
+    return role in get_user_roles(user)
+
+
+def is_moderator(user):
+    return has_role(user, MODERATOR_ROLE)
+
+
+async def ahas_role(user, role):
+    return role in await aget_user_roles(user)
+
+
+async def ais_moderator(user):
+    return await ahas_role(user, MODERATOR_ROLE)
+
+
+def invalidate_user_roles(user_or_pk):
+    """Сбрасывает закешированные роли пользователя."""
+    if hasattr(user_or_pk, 'pk'):
+        user_or_pk.__dict__.pop('_roles_cache', None)
+        user_or_pk = user_or_pk.pk
+    get_cache().delete(ROLES_CACHE_KEY.format(user_or_pk))
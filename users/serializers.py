@@ -1,5 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import RoleRefreshToken, set_role_claims
 
 
 User = get_user_model()
@@ -37,3 +42,23 @@ class LoginSerializer(serializers.Serializer):
         if user and user.is_active:
             return user
         raise serializers.ValidationError("Invalid credentials")
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Сериализатор получения пары токенов с claims ролей пользователя.
+    """
+    token_class = RoleRefreshToken
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Сериализатор обновления access-токена.
+    Claims ролей перечитываются из БД, поэтому изменения прав применяются при каждом обновлении токена.
+    """
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data['access'])
+        user = User.objects.get(**{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]})
+        data['access'] = str(set_role_claims(access, user))
+        return data
@@ -0,0 +1,20 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from .models import User
+from .roles import invalidate_user_roles
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def reset_roles_on_groups_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Сбрасывает кеш ролей при изменении состава групп как со стороны пользователя, так и группы."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_user_roles(instance)
+    elif pk_set:
+        for pk in pk_set:
+            invalidate_user_roles(pk)
+    else:  # post_clear со стороны группы: затронутые пользователи неизвестны
+        for pk in instance.user_set.values_list('pk', flat=True):
+            invalidate_user_roles(pk)
@@ -1,8 +1,17 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from network.permissions import IsActiveUser, IsModerator
+from users.authentication import RoleRefreshToken
+from users.checks import check_roles_cache_backend
+from users.roles import ROLES_CACHE_KEY, is_moderator
 
 
 User = get_user_model()
@@ -95,3 +104,97 @@ class UserTests(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(User.objects.count(), 0)
+
+
+class UserRolesTests(APITestCase):
+    def setUp(self):
+        self.moderator = User.objects.create_user(
+            email='moderator@example.com', password='password123', is_moderator=True
+        )
+
+    def test_roles_resolved_once_per_user_instance(self):
+        """
+        Тестирует, что роли пользователя запрашиваются из БД один раз на экземпляр.
+        """
+        user = User.objects.get(pk=self.moderator.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(is_moderator(user))
+            self.assertTrue(is_moderator(user))
+
+    @override_settings(USER_ROLES_CACHE_TIMEOUT=60)
+    def test_roles_cache_invalidated_on_save(self):
+        """
+        Тестирует, что кеш ролей между запросами сбрасывается при сохранении пользователя.
+        """
+        self.assertTrue(is_moderator(User.objects.get(pk=self.moderator.pk)))
+        user = User.objects.get(pk=self.moderator.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(is_moderator(user))
+
+        self.moderator.is_moderator = False
+        self.moderator.save()
+
+        self.assertFalse(is_moderator(User.objects.get(pk=self.moderator.pk)))
+
+    @override_settings(USER_ROLES_CACHE_TIMEOUT=60)
+    def test_roles_cached_in_shared_alias(self):
+        """
+        Тестирует, что роли хранятся в общем кеше USER_ROLES_CACHE_ALIAS, а процессный кеш отклоняется при деплое.
+        """
+        is_moderator(User.objects.get(pk=self.moderator.pk))
+        self.assertIsNotNone(caches[settings.USER_ROLES_CACHE_ALIAS].get(ROLES_CACHE_KEY.format(self.moderator.pk)))
+        self.assertIsNone(caches['default'].get(ROLES_CACHE_KEY.format(self.moderator.pk)))
+
+        local = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        shared = {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'response_cache'}
+        with override_settings(DEBUG=False, CACHES={'default': local, 'responses': local}):
+            self.assertEqual([error.id for error in check_roles_cache_backend(None)], ['users.E001'])
+            with override_settings(USER_ROLES_CACHE_TIMEOUT=0):
+                self.assertEqual(check_roles_cache_backend(None), [])
+        with override_settings(DEBUG=False, CACHES={'default': local, 'responses': shared}):
+            self.assertEqual(check_roles_cache_backend(None), [])
+
+
+class StatelessJWTTests(APITestCase):
+    def setUp(self):
+        self.moderator = User.objects.create_user(
+            email='moderator@example.com', password='password123', is_moderator=True
+        )
+
+    def test_token_contains_role_claims(self):
+        """
+        Тестирует, что выданный access-токен содержит claims активности и роли модератора.
+        """
+        response = self.client.post(
+            reverse('users:token_obtain_pair'), {'email': 'moderator@example.com', 'password': 'password123'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        access = AccessToken(response.data['access'])
+        self.assertTrue(access['is_active'])
+        self.assertTrue(access['is_moderator'])
+
+    def test_refresh_rereads_role_claims(self):
+        """
+        Тестирует, что при обновлении access-токена claims ролей берутся из БД.
+        """
+        refresh = RoleRefreshToken.for_user(self.moderator)
+        self.moderator.is_moderator = False
+        self.moderator.save()
+
+        response = self.client.post(reverse('users:token_refresh'), {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(AccessToken(response.data['access'])['is_moderator'])
+
+    def test_permissions_without_database(self):
+        """
+        Тестирует, что в режиме без состояния аутентификация и проверка разрешений не обращаются к БД.
+        """
+        access = RoleRefreshToken.for_user(self.moderator).access_token
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        with self.assertNumQueries(0):
+            user, _ = JWTStatelessUserAuthentication().authenticate(request)
+            request.user = user
+            self.assertTrue(IsActiveUser().has_permission(request, None))
+            self.assertTrue(IsModerator().has_permission(request, None))
+        self.assertEqual(user.pk, self.moderator.pk)
@@ -14,6 +14,7 @@ class UsersListAPIView(generics.ListAPIView):
     serializer_class = UserSerializer
     queryset = User.objects.all()
     filter_backends = [DjangoFilterBackend, OrderingFilter]
+    ordering_fields = ['id', 'email']  # Только уникальные поля: по ним строится курсор пагинации
     permission_classes = [IsAuthenticated]
 
 